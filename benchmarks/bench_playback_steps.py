@@ -0,0 +1,78 @@
+"""Per-step overhead of the Playback repeat loop on a large macro.
+
+Runs a synthetic macro with ``repeat=0`` (infinite) at a very high speed,
+so that waits are ~0 and the measured time is pure per-step overhead,
+once per output backend. Playback is stopped after a fixed wall time.
+Headless by default; add ``pynput`` to the backend list on a machine with
+a display to compare against real injection.
+
+Run from the repository root:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_playback_steps [null recording pynput]
+"""
+import sys
+import time
+from threading import Thread
+
+from PyQt5.QtCore import QCoreApplication, Qt
+
+from core.backends import BACKENDS
+from core.mouse_path import MousePath
+from core.playback import Playback
+from core.playback_plan import compile_plan
+
+
+def make_macro(n: int):
+    actions = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            path = MousePath([(x, x // 2) for x in range(0, 40, 4)], dt=[0] + [8] * 9)
+            actions.append({"type": "move", "path": path, "duration": 0.08})
+        elif kind == 1:
+            actions.append({"type": "click", "button": "Button.left", "x": i, "y": i, "duration": 0.05})
+        elif kind == 2:
+            actions.append({"type": "key", "key": "a", "duration": 0.0})
+        else:
+            actions.append({"type": "scroll", "x": 5, "y": 5, "dx": 0, "dy": -1, "duration": 0.0})
+    return actions
+
+
+def run(backend, actions, seconds: float):
+    pb = Playback(backend=backend)
+    backend.open()
+    pb._out = backend
+    t0 = time.perf_counter()
+    plan = compile_plan(actions, backend.resolve_button, backend.resolve_key)
+    compile_time = time.perf_counter() - t0
+    steps = [0]
+
+    def count(*_):
+        steps[0] += 1
+
+    pb.step_signal.connect(count, Qt.DirectConnection)
+    pb._set_speed(1e9)
+    worker = Thread(target=pb._execute, args=(plan, 0, True), daemon=True)
+    t0 = time.perf_counter()
+    worker.start()
+    time.sleep(seconds)
+    pb.stop()
+    worker.join()
+    elapsed = time.perf_counter() - t0
+
+    extra = f", {len(backend)} events recorded" if hasattr(backend, "__len__") else ""
+    print(f"[{backend.name}] plan compiled in {compile_time * 1e3:.1f} ms; "
+          f"repeat=0 for {elapsed:.2f}s: {steps[0]} steps, "
+          f"{elapsed / max(steps[0], 1) * 1e6:.2f} us/step{extra}")
+
+
+def main(names=("null", "recording"), n: int = 10_000, seconds: float = 3.0):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    actions = make_macro(n)
+    print(f"macro: {n} actions")
+    for name in names:
+        run(BACKENDS[name](), actions, seconds)
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ("null", "recording"))
@@ -0,0 +1,146 @@
+"""Worst-case step latency of a 1M-step playback, with and without realtime mode.
+
+Plays a synthetic 10k-action macro 100 times at a very high speed against
+a backend that only histograms the gap between consecutive injections.
+A background thread keeps allocating objects that live for a while on
+top of a large live heap, like the GUI thread does with a big macro
+loaded, so full (generation 2) collections happen during the run. Their
+pauses stall the playback thread; realtime mode should remove them.
+
+Run from the repository root:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_realtime
+"""
+import gc
+import sys
+import time
+from array import array
+from threading import Thread, Event
+
+from PyQt5.QtCore import QCoreApplication
+
+from benchmarks.bench_playback_steps import make_macro
+from core.backends import NullBackend
+from core.playback import Playback
+
+# Histogram resolution: 1 us buckets up to 100 ms
+_BUCKETS = 100_000
+
+
+class _GapBackend(NullBackend):
+    name = "gaps"
+
+    def __init__(self):
+        self.hist = array("i", bytes(4 * (_BUCKETS + 1)))
+        self.max_gap = 0.0
+        self.calls = 0
+        self._last = 0.0
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self.calls:
+            gap = now - self._last
+            if gap > self.max_gap:
+                self.max_gap = gap
+            self.hist[min(int(gap * 1e6), _BUCKETS)] += 1
+        self._last = now
+        self.calls += 1
+
+    def move(self, x, y):
+        self._tick()
+
+    def press(self, button):
+        self._tick()
+
+    def release(self, button):
+        self._tick()
+
+    def scroll(self, dx, dy):
+        self._tick()
+
+    def key_press(self, key):
+        self._tick()
+
+    def key_release(self, key):
+        self._tick()
+
+    def percentile_us(self, q):
+        target = q * max(self.calls - 1, 1)
+        seen = 0
+        for us, n in enumerate(self.hist):
+            seen += n
+            if seen >= target:
+                return us
+        return _BUCKETS
+
+
+def _churn(stop):
+    """Grow and drop batches of objects (like recording or loading a macro) until ``stop`` is set."""
+    batch = []
+    while not stop.is_set():
+        for i in range(2000):
+            batch.append([i])
+        if len(batch) >= 600_000:
+            batch = []
+        time.sleep(0.0005)
+
+
+class _GcPauses:
+    """Longest pause and count of full collections, via gc.callbacks."""
+
+    def __init__(self, backend):
+        self.full = 0
+        self.max_pause = 0.0
+        self._t0 = 0.0
+        self._backend = backend
+
+    def __call__(self, phase, info):
+        if not self._backend.calls:
+            return  # before the first step, e.g. realtime mode's own collect()
+        if phase == "start":
+            self._t0 = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._t0
+        if pause > self.max_pause:
+            self.max_pause = pause
+        if info["generation"] == 2:
+            self.full += 1
+
+
+def run(actions, repeat, realtime):
+    backend = _GapBackend()
+    pauses = _GcPauses(backend)
+    gc.callbacks.append(pauses)
+    pb = Playback(backend=backend)
+    t0 = time.perf_counter()
+    pb.play(actions, speed=1e9, repeat=repeat, timeline=True, realtime=realtime)
+    time.sleep(0.05)
+    while pb.is_active:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - t0
+    gc.callbacks.remove(pauses)
+    steps = len(actions) * repeat
+    print(f"  realtime={realtime!s:5}: {steps} steps in {elapsed:.1f}s, {backend.calls} injections, "
+          f"gap p50 {backend.percentile_us(0.5)} us, p99.9 {backend.percentile_us(0.999)} us, "
+          f"p99.99 {backend.percentile_us(0.9999)} us, max {backend.max_gap * 1e3:.2f} ms; "
+          f"{pauses.full} full GCs, longest GC pause {pauses.max_pause * 1e3:.2f} ms")
+
+
+def main(n: int = 10_000, repeat: int = 100, heap: int = 2_000_000):
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    actions = make_macro(n)
+    live = [[i] for i in range(heap)]
+    stop = Event()
+    churn = Thread(target=_churn, args=(stop,), daemon=True)
+    churn.start()
+    print(f"live heap: {len(live)} tracked lists, background allocation churn on")
+    try:
+        for realtime in (False, True):
+            run(actions, repeat, realtime)
+            app.processEvents()
+    finally:
+        stop.set()
+        churn.join()
+
+
+if __name__ == "__main__":
+    main()
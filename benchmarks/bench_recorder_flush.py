@@ -0,0 +1,70 @@
+"""Idle cost and pause-flush latency of the Recorder consumer thread, and
+stored path points per sampling-rate cap.
+
+Needs a desktop session (pynput listeners are started). Keep the mouse
+still while it runs; synthetic moves are injected through the hooks.
+
+Run from the repository root:
+    python -m benchmarks.bench_recorder_flush
+"""
+import math
+import sys
+import time
+
+from PyQt5.QtWidgets import QApplication
+
+from core.recorder import Recorder
+
+
+def main(idle_seconds: float = 2.0, segments: int = 20):
+    app = QApplication.instance() or QApplication(sys.argv)
+    rec = Recorder()
+    rec.start()
+    try:
+        # --- idle: no input at all ---
+        time.sleep(0.2)
+        wake0, cpu0 = rec.stats["wakeups"], time.process_time()
+        time.sleep(idle_seconds)
+        idle_wakeups = rec.stats["wakeups"] - wake0
+        idle_cpu = time.process_time() - cpu0
+
+        # --- segments: short bursts, each followed by a pause ---
+        for s in range(segments):
+            for i in range(50):
+                rec._on_move(100 + i, 100 + s)
+                time.sleep(0.001)
+            time.sleep(rec._pause_threshold + 0.05)
+    finally:
+        actions = rec.stop()
+    app.processEvents()
+
+    print(f"idle {idle_seconds:.1f}s: {idle_wakeups} consumer wakeups, {idle_cpu * 1e3:.2f} ms CPU")
+    print(f"segments: {len(actions)} moves, {rec.stats['flushes']} pause flushes, "
+          f"max flush lateness {rec.stats['max_flush_lateness'] * 1e3:.3f} ms")
+
+
+def points_per_cap(rates=(0, 1000, 240, 120, 60), seconds: float = 1.0):
+    """Stored move points for the same ~1 kHz curved input at each cap."""
+    print(f"stored points, {seconds:.1f}s of curved input per cap:")
+    for rate in rates:
+        rec = Recorder(sample_rate=rate)
+        rec.start()
+        try:
+            t0 = time.perf_counter()
+            i = 0
+            while time.perf_counter() - t0 < seconds:
+                rec._on_move(int(960 + 400 * math.cos(i / 150)), int(540 + 300 * math.sin(i / 90)))
+                i += 1
+                time.sleep(0.001)
+            # the move still open at stop is dropped; let the pause close it
+            time.sleep(rec._pause_threshold + 0.1)
+        finally:
+            actions = rec.stop()
+        points = sum(len(a["path"]) for a in actions if a.get("type") == "move")
+        label = f"{rate} Hz" if rate else "raw"
+        print(f"  cap {label:>8}: {i} samples in, {points} path points stored")
+
+
+if __name__ == "__main__":
+    main()
+    points_per_cap()
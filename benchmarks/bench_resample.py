@@ -0,0 +1,37 @@
+"""Path thinning: output size and speed per output rate.
+
+Builds a 1 kHz recorded path (default 10 minutes of motion) and thins it
+out to several output rates. Rate 0 (duplicates dropped only, a full pass
+over the input) is the baseline.
+
+Run from the repository root:
+    python -m benchmarks.bench_resample
+"""
+import math
+import time
+from array import array
+
+from core import resample
+
+
+def make_path(seconds: float = 600.0, hz: int = 1000):
+    xy, t = array("i"), array("d")
+    for i in range(int(seconds * hz)):
+        xy.append(int(960 + 600 * math.sin(i / 900)))
+        xy.append(int(540 + 400 * math.cos(i / 530)))
+        t.append(i / hz)
+    return xy, t
+
+
+def main(rates=(0, 60, 240, 1000)):
+    xy, t = make_path()
+    print(f"input: {len(t)} points over {t[-1]:.0f}s")
+    for rate in rates:
+        t0 = time.perf_counter()
+        _, out_t = resample.resample_path(xy, t, rate)
+        elapsed = time.perf_counter() - t0
+        print(f"  {rate:5d} Hz {len(out_t):8d} points in {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Micro-benchmark for ScreenFetcher.get_name.
+
+Run from the repository root:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_screen_fetcher
+"""
+import sys
+import timeit
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QPoint
+
+from core.screen_fetcher import ScreenFetcher
+
+
+def main(n: int = 200_000):
+    app = QApplication.instance() or QApplication(sys.argv)
+    fetcher = ScreenFetcher()
+    geo = app.primaryScreen().geometry()
+    inside = (geo.x() + geo.width() // 2, geo.y() + geo.height() // 2)
+    outside = (-100_000, -100_000)
+
+    def qt_lookup(x, y):
+        screen = QApplication.screenAt(QPoint(int(x), int(y)))
+        return screen.name() if screen else "Unknown"
+
+    cases = [
+        ("snapshot hit", lambda: fetcher.get_name(*inside)),
+        ("snapshot miss", lambda: fetcher.get_name(*outside)),
+        ("QApplication.screenAt (GUI thread only)", lambda: qt_lookup(*inside)),
+    ]
+    print(f"screens: {len(app.screens())}, calls per case: {n}")
+    for label, fn in cases:
+        total = min(timeit.repeat(fn, number=n, repeat=3))
+        print(f"  {label:<42} {total / n * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
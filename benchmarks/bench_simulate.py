@@ -0,0 +1,31 @@
+"""Virtual-clock playback: how fast a long macro can be "played".
+
+Simulates a synthetic macro (or a saved one) on a VirtualClock with the
+recording backend and prints the simulated runtime, the number of events
+and the wall time the simulation took.
+
+Run from the repository root:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_simulate [macro.json]
+"""
+import sys
+import time
+
+from benchmarks.bench_playback_steps import make_macro
+from core.playback import simulate
+from core.storage import Storage
+
+
+def main(path=None, n: int = 100_000):
+    actions = Storage.load(path) if path else make_macro(n)
+    for timeline in (True, False):
+        t0 = time.perf_counter()
+        events = simulate(actions, timeline=timeline)
+        elapsed = time.perf_counter() - t0
+        runtime = events.t[-1] if len(events) else 0.0
+        print(f"timeline={timeline!s:5}: {len(actions)} actions, {len(events)} events, "
+              f"simulated {runtime:.1f}s in {elapsed:.2f}s wall "
+              f"({runtime / max(elapsed, 1e-9):.0f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,65 @@
+"""CPU cost and lateness of the playback wait strategies.
+
+Schedules events on a fixed grid (default: every 1 ms, like path points)
+and reports process CPU time plus p50/p99/max lateness per strategy.
+
+Run from the repository root:
+    python -m benchmarks.bench_sleeper
+"""
+import time
+
+from core.timing import Sleeper
+
+
+def _legacy_wait(deadline):
+    """The old Playback loop: poll perf_counter with 0.5 ms sleeps."""
+    while time.perf_counter() < deadline:
+        time.sleep(0.0005)
+
+
+def _plain_sleep(deadline):
+    remaining = deadline - time.perf_counter()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run(wait, events: int, interval: float):
+    lateness = []
+    cpu0 = time.process_time()
+    start = time.perf_counter() + 0.01
+    for i in range(events):
+        deadline = start + i * interval
+        wait(deadline)
+        lateness.append(time.perf_counter() - deadline)
+    cpu = time.process_time() - cpu0
+    wall = events * interval
+    lateness.sort()
+    return cpu / wall, lateness
+
+
+def main(events: int = 2000, interval: float = 0.001):
+    strategies = [
+        ("legacy poll (sleep 0.5 ms)", _legacy_wait),
+        ("time.sleep only", _plain_sleep),
+        ("Sleeper spin 0.5 ms", Sleeper(0.0005).sleep_until),
+        ("Sleeper spin 1 ms", Sleeper(0.001).sleep_until),
+        ("Sleeper spin 2 ms", Sleeper(0.002).sleep_until),
+    ]
+    print(f"{events} events every {interval * 1e3:.2f} ms")
+    print(f"  {'strategy':<28} {'CPU':>6} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+    for label, wait in strategies:
+        cpu_share, late = run(wait, events, interval)
+        print(f"  {label:<28} {cpu_share * 100:5.1f}% "
+              f"{_percentile(late, 0.50) * 1e6:8.1f} {_percentile(late, 0.99) * 1e6:8.1f} "
+              f"{late[-1] * 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
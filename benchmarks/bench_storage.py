@@ -0,0 +1,97 @@
+"""Macro file size and save/load time per storage format.
+
+Builds a synthetic macro tree with long timed moves and drags, and one
+with many short click / key / scroll actions, saves and loads each in
+every format Storage supports (plus plain JSON with
+delta-encoded paths), and checks that each format round-trips to the same
+JSON. Also reports how soon MacroStream hands out the first top-level node.
+
+Run from the repository root:
+    python -m benchmarks.bench_storage
+"""
+import json
+import math
+import tempfile
+import time
+from pathlib import Path
+
+from core.mouse_path import MousePath
+from core.storage import Storage, MacroStream, SUFFIXES, _encode
+
+
+def make_tree(groups: int = 20, actions: int = 50, points: int = 2000):
+    nodes = []
+    for g in range(groups):
+        children = []
+        for a in range(actions):
+            n = g * actions + a
+            if a % 2:
+                children.append({"kind": "action", "data": {
+                    "type": "click", "button": "Button.left", "x": n, "y": 2 * n,
+                    "duration": 0.05, "screen": "DP-1", "_uid": f"uid-{n}",
+                }})
+                continue
+            path = MousePath(dt=())
+            for i in range(points):
+                path.append(int(960 + 500 * math.sin((n + i) / 300)),
+                            int(540 + 300 * math.cos((n + i) / 170)), 1 if i else 0)
+            children.append({"kind": "action", "data": {
+                "type": "move" if a % 4 else "drag", "path": path, "duration": points / 1000,
+                "screen": "DP-1", "sample_rate": 1000, "_uid": f"uid-{n}",
+            }})
+        nodes.append({"kind": "__group__", "data": {"name": f"Group {g}", "comment": ""}, "children": children})
+    return nodes
+
+
+def make_events(groups: int = 20, actions: int = 2500):
+    nodes = []
+    for g in range(groups):
+        children = []
+        for a in range(actions):
+            n = g * actions + a
+            if a % 3 == 0:
+                data = {"type": "click", "button": "Button.left", "x": n % 1920, "y": n % 1080}
+            elif a % 3 == 1:
+                data = {"type": "key", "key": "Key.space" if a % 5 else chr(97 + n % 26)}
+            else:
+                data = {"type": "scroll", "x": n % 1920, "y": n % 1080, "dx": 0, "dy": -1}
+            data.update({"duration": round(0.05 + (n % 17) / 100, 3), "screen": "DP-1", "_uid": f"uid-{n}"})
+            children.append({"kind": "action", "data": data, "children": []})
+        nodes.append({"kind": "__group__", "data": {"name": f"Group {g}", "comment": ""}, "children": children})
+    return nodes
+
+
+def _as_json(nodes):
+    return json.dumps(nodes, default=_encode, sort_keys=True)
+
+
+def main():
+    for title, tree in (("long paths", make_tree()), ("many short actions", make_events())):
+        print(f"{title}:")
+        run(tree)
+
+
+def run(tree):
+    reference = _as_json(tree)
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = [(suffix, None, suffix) for suffix in SUFFIXES]
+        variants.insert(1, (".json", True, ".json +delta"))
+        for n, (suffix, delta, label) in enumerate(variants):
+            path = Path(tmp) / f"macro{n}{suffix}"
+            t0 = time.perf_counter()
+            Storage.save(path, tree, delta=delta)
+            saved = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            loaded = Storage.load(path)
+            load_time = time.perf_counter() - t0
+            lossless = _as_json(loaded) == reference
+            t0 = time.perf_counter()
+            next(iter(MacroStream(path)))
+            first = time.perf_counter() - t0
+            print(f"  {label:<14} {path.stat().st_size / 1e6:8.2f} MB  save {saved * 1e3:8.1f} ms  "
+                  f"load {load_time * 1e3:8.1f} ms  first streamed node {first * 1e3:7.1f} ms  "
+                  f"lossless={lossless}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from threading import Thread, Event, Lock
+
+from core.storage import Storage
+
+
+class Autosaver:
+    """Writes autosave snapshots on a background thread.
+
+    ``submit`` hands over a snapshot that nobody mutates anymore and returns
+    immediately. The worker writes it with :meth:`Storage.save` (temp file +
+    atomic rename). Snapshots submitted while a write is in progress replace
+    each other, so only the newest one is written next. ``on_saved(ok,
+    token)`` is called on the worker thread after each write.
+    """
+
+    def __init__(self, path, on_saved=None):
+        self.path = path
+        self.on_saved = on_saved
+        self._lock = Lock()
+        self._wake = Event()
+        self._stopping = False
+        self._pending = None
+        self._thread = None
+
+    def submit(self, snapshot, token=None):
+        with self._lock:
+            self._pending = (snapshot, token)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = Thread(target=self._work, daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Finish any pending write and end the worker."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def _work(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    job, self._pending = self._pending, None
+                if job is None:
+                    break
+                snapshot, token = job
+                ok = Storage.save(self.path, snapshot)
+                if self.on_saved:
+                    try:
+                        self.on_saved(ok, token)
+                    except Exception as e:
+                        print(f"[AUTOSAVE ERROR] {e}")
+            if self._stopping:
+                return
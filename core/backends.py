@@ -0,0 +1,206 @@
+import time
+from array import array
+
+from core.event_ring import EV_MOVE, EV_PRESS, EV_RELEASE, EV_KEY_DOWN, EV_KEY_UP, EV_SCROLL
+
+
+class OutputBackend:
+    """Interface Playback drives to inject input.
+
+    ``open`` is called on the playback worker thread before the first run,
+    ``resolve_button`` / ``resolve_key`` map recorded names to whatever the
+    backend wants back in ``press`` / ``key_press``. All methods must be
+    cheap: they run inside the timed loop.
+    """
+
+    name = "base"
+
+    def open(self):
+        pass
+
+    def resolve_button(self, name):
+        raise NotImplementedError
+
+    def resolve_key(self, name):
+        raise NotImplementedError
+
+    def move(self, x: int, y: int):
+        raise NotImplementedError
+
+    def press(self, button):
+        raise NotImplementedError
+
+    def release(self, button):
+        raise NotImplementedError
+
+    def scroll(self, dx: int, dy: int):
+        raise NotImplementedError
+
+    def key_press(self, key):
+        raise NotImplementedError
+
+    def key_release(self, key):
+        raise NotImplementedError
+
+
+# =====================================================
+# pynput
+# =====================================================
+class PynputBackend(OutputBackend):
+    """Injects real input through pynput controllers."""
+
+    name = "pynput"
+
+    def __init__(self):
+        self._mouse = None
+        self._keyboard = None
+        self._mod_mouse = None
+        self._mod_keyboard = None
+
+    def open(self):
+        if self._mouse is not None:
+            return
+        # imported here so headless backends work without a display
+        from pynput import mouse, keyboard
+        self._mod_mouse, self._mod_keyboard = mouse, keyboard
+        self._mouse = mouse.Controller()
+        self._keyboard = keyboard.Controller()
+
+    def resolve_button(self, name):
+        buttons = self._mod_mouse.Button
+        btn_name = str(name or "left").split(".")[-1]
+        return getattr(buttons, btn_name, buttons.left)
+
+    def resolve_key(self, name):
+        """Map a recorded key name to what keyboard.Controller expects."""
+        if not isinstance(name, str) or not name:
+            return None
+        if len(name) == 1:
+            return name
+        keyboard = self._mod_keyboard
+        key = getattr(keyboard.Key, name, None)
+        if key is not None:
+            return key
+        if name.startswith("<") and name.endswith(">") and name[1:-1].isdigit():
+            return keyboard.KeyCode.from_vk(int(name[1:-1]))
+        return None
+
+    def move(self, x, y):
+        self._mouse.position = (x, y)
+
+    def press(self, button):
+        self._mouse.press(button)
+
+    def release(self, button):
+        self._mouse.release(button)
+
+    def scroll(self, dx, dy):
+        self._mouse.scroll(dx, dy)
+
+    def key_press(self, key):
+        self._keyboard.press(key)
+
+    def key_release(self, key):
+        self._keyboard.release(key)
+
+
+# =====================================================
+# Headless
+# =====================================================
+class NullBackend(OutputBackend):
+    """Accepts everything and injects nothing; buttons and keys stay names."""
+
+    name = "null"
+
+    def resolve_button(self, name):
+        return str(name or "left").split(".")[-1]
+
+    def resolve_key(self, name):
+        if not isinstance(name, str) or not name:
+            return None
+        return name
+
+    def move(self, x, y):
+        pass
+
+    def press(self, button):
+        pass
+
+    def release(self, button):
+        pass
+
+    def scroll(self, dx, dy):
+        pass
+
+    def key_press(self, key):
+        pass
+
+    def key_release(self, key):
+        pass
+
+
+class RecordingBackend(NullBackend):
+    """Records every injected event with a timestamp from ``clock.now``.
+
+    Without a clock, timestamps come from ``time.perf_counter``.
+
+    Events are kept in flat arrays using the ``EV_*`` kinds of
+    :mod:`core.event_ring`: moves store the position, scrolls store
+    ``(dx, dy)`` in ``x``/``y``, presses and key events store the button or
+    key in ``arg`` and the pointer position in ``x``/``y``.
+    """
+
+    name = "recording"
+
+    def __init__(self, clock=None):
+        self._now = clock.now if clock is not None else time.perf_counter
+        self.clear()
+
+    def clear(self):
+        self.kind = array("b")
+        self.t = array("d")
+        self.x = array("i")
+        self.y = array("i")
+        self.arg = []
+        self._pos = (0, 0)
+
+    def __len__(self):
+        return len(self.kind)
+
+    @property
+    def events(self):
+        """All events as ``(kind, t, x, y, arg)`` tuples."""
+        return list(zip(self.kind, self.t, self.x, self.y, self.arg))
+
+    def _log(self, kind, x, y, arg=None):
+        self.kind.append(kind)
+        self.t.append(self._now())
+        self.x.append(x)
+        self.y.append(y)
+        self.arg.append(arg)
+
+    def move(self, x, y):
+        self._pos = (x, y)
+        self._log(EV_MOVE, x, y)
+
+    def press(self, button):
+        self._log(EV_PRESS, *self._pos, button)
+
+    def release(self, button):
+        self._log(EV_RELEASE, *self._pos, button)
+
+    def scroll(self, dx, dy):
+        self._log(EV_SCROLL, dx, dy)
+
+    def key_press(self, key):
+        self._log(EV_KEY_DOWN, *self._pos, key)
+
+    def key_release(self, key):
+        self._log(EV_KEY_UP, *self._pos, key)
+
+
+BACKENDS = {
+    PynputBackend.name: PynputBackend,
+    NullBackend.name: NullBackend,
+    RecordingBackend.name: RecordingBackend,
+}
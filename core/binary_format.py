@@ -0,0 +1,250 @@
+"""Compact binary container for macros (``.pymacro``).
+
+Layout (little endian)::
+
+    header   "PYCM" | u16 version | u16 flags
+    body     zlib(  u32 tables_len | u32 tree_len | u32 row_count | u32 path_count
+                    | tables: compact UTF-8 JSON {"strings": [...],
+                      "layouts": [[key, ...], ...]}
+                    | tree: compact UTF-8 JSON of the action tree
+                    | action table, one column after the other, row_count
+                      entries each: u32 layout | u32 type | f64 duration
+                                    | i32 x | i32 y | u32 button | u32 key
+                                    | u32 path
+                    | path_count x ( u32 points | u32 dt_len | u8 has_dt
+                                     | int32[2 * points] delta-encoded xy
+                                     | uint32[dt_len] dt ) )
+
+Every action (a dict with a string ``type``) becomes one row of the action
+table, which is stored column by column so zlib sees runs of similar
+values. The fixed fields ``type``, ``duration``, ``x``, ``y``, ``button``,
+``key`` and ``path`` go into the table when they have the expected type
+(strings as indices into ``strings``, paths as indices into the path
+blocks). The action is left in the tree as ``{"$row": n, ...}`` holding
+only its free-form fields (ids, comments, screen names, ...). ``layout``
+indexes the action's key order, so a loaded action is equal to the saved
+one key for key. Paths found anywhere else are replaced by ``{"$path": n}``.
+
+Point coordinates are stored as differences to the previous point (x and y
+separately), which keeps them small and lets zlib shrink them well. The
+round trip to the JSON format is lossless. Version 1 files (no action
+table, the whole tree as JSON) are still read.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from operator import sub
+
+from core.mouse_path import MousePath
+
+MAGIC = b"PYCM"
+VERSION = 2
+BINARY_SUFFIX = ".pymacro"
+
+_HEADER = struct.Struct("<4sHH")
+_SECTIONS_V1 = struct.Struct("<II")
+_SECTIONS = struct.Struct("<IIII")
+_PATH = struct.Struct("<IIB")
+
+# Action fields kept in the table (in column order, after the layout), the
+# exact type a value needs to be stored there, and the column's array type
+_FIXED = (("type", str, "I"), ("duration", float, "d"), ("x", int, "i"), ("y", int, "i"),
+          ("button", str, "I"), ("key", str, "I"), ("path", MousePath, "I"))
+_COLUMNS = {name: (col, kind) for col, (name, kind, _) in enumerate(_FIXED, 1)}
+_TYPECODES = ("I",) + tuple(code for _, _, code in _FIXED)
+_INT32 = range(-2 ** 31, 2 ** 31)
+_NESTED = (list, dict)
+
+_SWAP = sys.byteorder == "big"
+
+
+def dumps(nodes, level: int = 6) -> bytes:
+    tables = _Tables()
+    tree = json.dumps(tables.pack(nodes), separators=(",", ":"), ensure_ascii=False,
+                      default=tables.pull_path).encode("utf-8")
+    head = json.dumps({"strings": tables.strings, "layouts": tables.layouts},
+                      separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    parts = [_SECTIONS.pack(len(head), len(tree), len(tables.rows), len(tables.paths)), head, tree]
+    for column in tables.columns:
+        if _SWAP:
+            column.byteswap()
+        parts.append(column.tobytes())
+    for path in tables.paths:
+        parts.extend(_pack_path(path))
+    return _HEADER.pack(MAGIC, VERSION, 0) + zlib.compress(b"".join(parts), level)
+
+
+def loads(data: bytes):
+    if len(data) < _HEADER.size:
+        raise ValueError("not a macro file (too short)")
+    magic, version, _flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a macro file (bad magic)")
+    if version > VERSION:
+        raise ValueError(f"unsupported macro file version {version}")
+    body = zlib.decompress(memoryview(data)[_HEADER.size:])
+    if version < 2:
+        tree_len, path_count = _SECTIONS_V1.unpack_from(body)
+        head_len = row_count = 0
+        pos = _SECTIONS_V1.size
+    else:
+        head_len, tree_len, row_count, path_count = _SECTIONS.unpack_from(body)
+        pos = _SECTIONS.size
+    strings, layouts = (), ()
+    if head_len:
+        head = json.loads(body[pos:pos + head_len].decode("utf-8"))
+        strings, layouts = head["strings"], head["layouts"]
+    pos += head_len
+    tree = body[pos:pos + tree_len]
+    pos += tree_len
+    columns = []
+    for code in _TYPECODES if row_count else ():
+        column = array(code)
+        end = pos + column.itemsize * row_count
+        column.frombytes(body[pos:end])
+        if _SWAP:
+            column.byteswap()
+        columns.append(column)
+        pos = end
+    paths = []
+    for _ in range(path_count):
+        path, pos = _unpack_path(body, pos)
+        paths.append(path)
+
+    # column values as stored in the action (unused cells map to whatever is at index 0)
+    for col, (_, kind, _) in enumerate(_FIXED, 1):
+        if columns and kind in (str, MousePath):
+            table = (strings if kind is str else paths) or [None]
+            columns[col] = [table[i] for i in columns[col]]
+    # per layout: its keys in order and the (key, column) pairs it can use
+    plans = [(keys, [(key, columns[_COLUMNS[key][0]]) for key in keys if key in _COLUMNS])
+             for keys in layouts]
+
+    def put(obj):
+        row = obj.pop("$row", None)
+        if row is not None:
+            keys, fixed = plans[columns[0][row]]
+            act = dict.fromkeys(keys)
+            for key, column in fixed:
+                act[key] = column[row]
+            act.update(obj)  # free-form values, including fixed fields of another type
+            return act
+        if len(obj) == 1 and "$path" in obj:
+            return paths[obj["$path"]]
+        return obj
+
+    return json.loads(tree.decode("utf-8"), object_hook=put)
+
+
+# =====================================================
+# Action table
+# =====================================================
+class _Tables:
+    """Collects the action table, strings, key layouts and paths of one file."""
+
+    def __init__(self):
+        self.rows = []
+        self.strings = []
+        self.layouts = []
+        self.paths = []
+        self._string_ids = {}
+        self._plans = {}
+
+    @property
+    def columns(self):
+        """The rows transposed into one typed array per column."""
+        if not self.rows:
+            return []
+        return [array(code, column) for code, column in zip(_TYPECODES, zip(*self.rows))]
+
+    def pack(self, obj):
+        """Copy of ``obj`` with every action replaced by its row reference."""
+        if isinstance(obj, list):
+            return [self.pack(v) if isinstance(v, _NESTED) else v for v in obj]
+        if isinstance(obj.get("type"), str):
+            return self._add_action(obj)
+        return {k: self.pack(v) if isinstance(v, _NESTED) else v for k, v in obj.items()}
+
+    def pull_path(self, obj):
+        """json.dumps hook for paths outside the action table."""
+        if isinstance(obj, MousePath):
+            return {"$path": self._path_id(obj)}
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _add_action(self, act):
+        keys = tuple(act)
+        plan = self._plans.get(keys)
+        if plan is None:
+            # layout id and the table column (or None) of every key
+            plan = self._plans[keys] = (len(self.layouts), [_COLUMNS.get(key) for key in keys])
+            self.layouts.append(list(keys))
+        row = [plan[0], 0, 0.0, 0, 0, 0, 0, 0]
+        free = {"$row": len(self.rows)}
+        # claim the row before packing values that may hold actions too
+        self.rows.append(row)
+        for key, value, fixed in zip(keys, act.values(), plan[1]):
+            if fixed is None or type(value) is not fixed[1]:
+                free[key] = self.pack(value) if isinstance(value, _NESTED) else value
+                continue
+            col, kind = fixed
+            if kind is str:
+                value = self._string_id(value)
+            elif kind is MousePath:
+                value = self._path_id(value)
+            elif kind is int and value not in _INT32:
+                free[key] = value
+                continue
+            row[col] = value
+        return free
+
+    def _string_id(self, text):
+        sid = self._string_ids.get(text)
+        if sid is None:
+            sid = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return sid
+
+    def _path_id(self, path):
+        self.paths.append(path)
+        return len(self.paths) - 1
+
+
+# =====================================================
+# Paths
+# =====================================================
+def _pack_path(path):
+    xy = path.xy
+    delta = array("i", xy[:2])
+    delta.extend(map(sub, xy[2:], xy[:-2]))
+    dt = path.dt if path.dt is not None else array("I")
+    if _SWAP:
+        delta.byteswap()
+        dt = array("I", dt)
+        dt.byteswap()
+    header = _PATH.pack(len(xy) // 2, len(dt), path.dt is not None)
+    return header, delta.tobytes(), dt.tobytes()
+
+
+def _unpack_path(body, pos):
+    points, dt_len, has_dt = _PATH.unpack_from(body, pos)
+    pos += _PATH.size
+    delta = array("i")
+    delta.frombytes(body[pos:pos + 8 * points])
+    pos += 8 * points
+    dt = array("I")
+    dt.frombytes(body[pos:pos + 4 * dt_len])
+    pos += 4 * dt_len
+    if _SWAP:
+        delta.byteswap()
+        dt.byteswap()
+
+    path = MousePath()
+    xy = array("i", bytes(8 * points))
+    xy[0::2] = array("i", accumulate(delta[0::2]))
+    xy[1::2] = array("i", accumulate(delta[1::2]))
+    path.xy = xy
+    path.dt = dt if has_dt else None
+    return path, pos
@@ -6,6 +6,7 @@ import os
 HOTKEY_MAP = {
     "record_toggle": "F9",
     "play_toggle": "F10",
+    "pause_toggle": "F11",
 }
 
 # Keys ignored by the Recorder to prevent capturing its own hotkeys
@@ -36,3 +37,24 @@ APPDATA_DIR.mkdir(parents=True, exist_ok=True)
 
 # Autosave location
 AUTOSAVE_PATH = APPDATA_DIR / "autosave.json"
+
+# Autosave after this much quiet time following an edit, but at least this often while editing (ms)
+AUTOSAVE_DELAY_MS = 2000
+AUTOSAVE_MAX_DELAY_MS = 30000
+
+# Crash-safe journal of actions recorded since the last autosave
+JOURNAL_PATH = APPDATA_DIR / "recording.journal.jsonl"
+
+# Playback timing telemetry exports (CSV/JSON per run)
+TELEMETRY_DIR = APPDATA_DIR / "telemetry"
+
+# Macro library folder and its search index
+LIBRARY_DIR = APPDATA_DIR / "library"
+LIBRARY_INDEX_PATH = APPDATA_DIR / "library.sqlite3"
+
+# Upper bound for injected mouse positions per second during playback (0 = no cap)
+PLAYBACK_MAX_RATE = 240
+
+# Realtime playback: nice value and CPU for the playback thread (None = leave as is)
+REALTIME_NICE = -10
+REALTIME_CPU = None
@@ -0,0 +1,72 @@
+from array import array
+
+# Raw input record kinds
+EV_MOVE = 0
+EV_PRESS = 1
+EV_RELEASE = 2
+EV_KEY_DOWN = 3
+EV_KEY_UP = 4
+EV_SCROLL = 5
+
+
+class EventRing:
+    """Bounded, preallocated single-producer / single-consumer ring of raw input records.
+
+    Each record is ``(kind, t, x, y, arg)``. The producer (an input hook
+    thread) only writes into preallocated slots and bumps ``_head``; the
+    consumer reads up to ``_head`` and bumps ``_tail``. Neither side takes a
+    lock. When the ring is full, new records are dropped and counted instead
+    of blocking the producer.
+    """
+
+    def __init__(self, capacity: int = 8192):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+        self._kind = array("b", bytes(size))
+        self._t = array("d", bytes(8 * size))
+        self._x = array("i", bytes(4 * size))
+        self._y = array("i", bytes(4 * size))
+        self._arg = [None] * size
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._head - self._tail
+
+    # =====================================================
+    # Producer side
+    # =====================================================
+    def push(self, kind: int, t: float, x: int = 0, y: int = 0, arg=None) -> bool:
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return False
+        i = head & self._mask
+        self._kind[i] = kind
+        self._t[i] = t
+        self._x[i] = x
+        self._y[i] = y
+        self._arg[i] = arg
+        self._head = head + 1
+        return True
+
+    # =====================================================
+    # Consumer side
+    # =====================================================
+    def drain(self):
+        """Pop and return all pending records as a list of tuples."""
+        tail, head = self._tail, self._head
+        mask = self._mask
+        kind, t, xs, ys, args = self._kind, self._t, self._x, self._y, self._arg
+        out = []
+        while tail < head:
+            i = tail & mask
+            out.append((kind[i], t[i], xs[i], ys[i], args[i]))
+            args[i] = None
+            tail += 1
+        self._tail = tail
+        return out
@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from core.storage import _encode, _decode
+
+
+class Journal:
+    """Append-only JSON Lines journal of recorded actions.
+
+    Every finished action is written as one line and flushed to the OS right
+    away, so a killed process loses nothing that was already recorded. The
+    file is fsynced at most every ``fsync_interval`` seconds and on close.
+    Each recording session starts with a ``{"session": <unix time>}`` line.
+
+    The journal is discarded once its contents are safely in the autosave;
+    a journal found on startup therefore holds actions that were never saved.
+    """
+
+    def __init__(self, path, fsync_interval: float = 1.0):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_sync = 0.0
+
+    # =====================================================
+    # Writing
+    # =====================================================
+    def open(self):
+        """Start a new session (appends; earlier unsaved sessions are kept)."""
+        if self._file:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._write({"session": time.time()})
+        self.sync()
+
+    def append(self, act: dict):
+        if not self._file:
+            return
+        self._write(act)
+        if time.perf_counter() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if not self._file:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            print(f"[JOURNAL ERROR] fsync failed: {e}")
+        self._last_sync = time.perf_counter()
+
+    def close(self):
+        if not self._file:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def discard(self):
+        """Remove the journal after its actions were saved elsewhere."""
+        if self._file:
+            return
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"[JOURNAL ERROR] Failed to remove {self.path}: {e}")
+
+    def _write(self, record: dict):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=_encode)
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    # =====================================================
+    # Recovery
+    # =====================================================
+    @staticmethod
+    def recover(path):
+        """Return ``[(session_start, [actions...]), ...]`` from a leftover journal.
+
+        A torn last line (crash mid-write) is skipped.
+        """
+        path = Path(path)
+        if not path.exists():
+            return []
+        sessions = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line, object_hook=_decode)
+                    except ValueError:
+                        continue
+                    if not isinstance(record, dict):
+                        continue
+                    if "session" in record:
+                        sessions.append((record["session"], []))
+                    elif record.get("type"):
+                        if not sessions:
+                            sessions.append((None, []))
+                        sessions[-1][1].append(record)
+        except Exception as e:
+            print(f"[JOURNAL ERROR] Failed to read {path}: {e}")
+        return [(start, actions) for start, actions in sessions if actions]
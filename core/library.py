@@ -0,0 +1,263 @@
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+
+from core.storage import Storage, SUFFIXES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS macros (
+    id        INTEGER PRIMARY KEY,
+    path      TEXT NOT NULL UNIQUE,
+    name      TEXT NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    hash      TEXT NOT NULL,
+    groups    TEXT NOT NULL,
+    comments  TEXT NOT NULL,
+    actions   INTEGER NOT NULL,
+    keys      TEXT NOT NULL,
+    duration  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS macros_name ON macros(name COLLATE NOCASE);
+"""
+
+# Full-text index over name, groups, comments and keys (rowid = macros.id).
+# Falls back to a plain table searched with LIKE where SQLite lacks FTS5.
+_FTS = "CREATE VIRTUAL TABLE IF NOT EXISTS macro_search USING fts5(text)"
+_PLAIN = "CREATE TABLE IF NOT EXISTS macro_search (rowid INTEGER PRIMARY KEY, text TEXT NOT NULL)"
+
+_ROW = "id, path, name, groups, comments, actions, keys, duration, hash"
+
+_WORD = re.compile(r"\w+")
+_UNSAFE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def summarize(nodes):
+    """Collect the indexed fields of a macro tree.
+
+    Returns a dict with ``groups`` and ``comments`` (newline separated),
+    ``actions`` (count), ``keys`` (key names of key actions in order,
+    space separated) and ``duration`` (sum of action durations in seconds).
+    """
+    groups, comments, keys = [], [], []
+    actions = 0
+    duration = 0.0
+    stack = list(reversed(nodes or []))
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        data = node.get("data") or {}
+        if data.get("comment"):
+            comments.append(str(data["comment"]))
+        if node.get("kind") == "__group__":
+            groups.append(str(data.get("name", "")))
+            stack.extend(reversed(node.get("children") or []))
+        elif node.get("kind") == "action":
+            actions += 1
+            try:
+                duration += float(data.get("duration") or 0)
+            except (TypeError, ValueError):
+                pass
+            if data.get("type") == "key" and data.get("key"):
+                keys.append(str(data["key"]))
+    return {
+        "groups": "\n".join(groups),
+        "comments": "\n".join(comments),
+        "actions": actions,
+        "keys": " ".join(keys),
+        "duration": round(duration, 3),
+    }
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _safe_name(name: str) -> str:
+    return _UNSAFE.sub("_", name).strip(" .") or "Macro"
+
+
+def _macro_name(path: Path) -> str:
+    name = path.name
+    for suffix in SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return path.stem
+
+
+class MacroLibrary:
+    """Folder of macro files with an SQLite index for fast search.
+
+    Every macro file under ``root`` gets one row holding its name, group
+    names, comments, action count, key sequence, total duration and a
+    content hash, so browsing and searching never parse macro files.
+    :meth:`refresh` re-indexes only files whose mtime or size changed (and
+    only re-parses them if the content hash changed too) and drops rows of
+    deleted files. Paths are stored relative to ``root``.
+
+    Each call opens its own short-lived connection, so the index can be
+    refreshed on a worker thread while the GUI thread searches it.
+    """
+
+    def __init__(self, root, index_path):
+        self.root = Path(root)
+        self.index_path = Path(index_path)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.execute(_FTS)
+            except sqlite3.OperationalError:
+                conn.execute(_PLAIN)
+            conn.commit()
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'macro_search'").fetchone()[0]
+        finally:
+            conn.close()
+        self._fts = "fts5" in sql.lower()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def path_of(self, row) -> Path:
+        return self.root / row["path"]
+
+    # =====================================================
+    # Indexing
+    # =====================================================
+    def refresh(self):
+        """Update the index from the files on disk. Returns (updated, removed)."""
+        updated = 0
+        conn = self._connect()
+        try:
+            known = {r["path"]: r for r in conn.execute("SELECT id, path, mtime_ns, size, hash FROM macros")}
+            seen = set()
+            for file in sorted(self.root.rglob("*")):
+                if not file.name.lower().endswith(SUFFIXES) or not file.is_file():
+                    continue
+                rel = file.relative_to(self.root).as_posix()
+                seen.add(rel)
+                try:
+                    st = file.stat()
+                    old = known.get(rel)
+                    if old is not None and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                        continue
+                    self._index(conn, file, rel, st, old)
+                    updated += 1
+                except OSError as e:
+                    print(f"[LIBRARY ERROR] Failed to index {file}: {e}")
+            gone = [(known[rel]["id"],) for rel in known.keys() - seen]
+            conn.executemany("DELETE FROM macros WHERE id = ?", gone)
+            conn.executemany("DELETE FROM macro_search WHERE rowid = ?", gone)
+            conn.commit()
+        finally:
+            conn.close()
+        return updated, len(gone)
+
+    def _index(self, conn, file, rel, st, old):
+        digest = _file_hash(file)
+        if old is not None and old["hash"] == digest:
+            # touched or copied over with the same content
+            conn.execute("UPDATE macros SET mtime_ns = ?, size = ? WHERE id = ?",
+                         (st.st_mtime_ns, st.st_size, old["id"]))
+            return
+        info = summarize(Storage.load(file))
+        name = _macro_name(file)
+        values = (name, st.st_mtime_ns, st.st_size, digest, info["groups"], info["comments"],
+                  info["actions"], info["keys"], info["duration"])
+        if old is None:
+            row_id = conn.execute(
+                "INSERT INTO macros (name, mtime_ns, size, hash, groups, comments, actions, keys, duration, path)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values + (rel,)).lastrowid
+        else:
+            row_id = old["id"]
+            conn.execute(
+                "UPDATE macros SET name = ?, mtime_ns = ?, size = ?, hash = ?, groups = ?, comments = ?,"
+                " actions = ?, keys = ?, duration = ? WHERE id = ?", values + (row_id,))
+            conn.execute("DELETE FROM macro_search WHERE rowid = ?", (row_id,))
+        text = "\n".join((name, info["groups"], info["comments"], info["keys"]))
+        conn.execute("INSERT INTO macro_search (rowid, text) VALUES (?, ?)",
+                     (row_id, text if self._fts else text.lower()))
+
+    def existing(self, name: str):
+        """Path of the library macro called ``name`` (in any format), or None."""
+        name = _safe_name(name)
+        for suffix in SUFFIXES:
+            path = self.root / f"{name}{suffix}"
+            if path.is_file():
+                return path
+        return None
+
+    def add(self, name: str, nodes, suffix: str = ".json.gz", overwrite: bool = False):
+        """Save ``nodes`` into the library as ``name`` and index it. Returns the path or None.
+
+        An existing macro of that name is only replaced (in its own format)
+        with ``overwrite``; otherwise the new one is saved as ``name (2)``,
+        ``name (3)``, ...
+        """
+        name = _safe_name(name)
+        path = self.existing(name)
+        if path is not None and not overwrite:
+            n = 2
+            while self.existing(f"{name} ({n})") is not None:
+                n += 1
+            path = None
+            name = f"{name} ({n})"
+        if path is None:
+            path = self.root / f"{name}{suffix}"
+        if not Storage.save(path, nodes):
+            return None
+        rel = path.relative_to(self.root).as_posix()
+        conn = self._connect()
+        try:
+            old = conn.execute("SELECT id, path, mtime_ns, size, hash FROM macros WHERE path = ?", (rel,)).fetchone()
+            self._index(conn, path, rel, path.stat(), old)
+            conn.commit()
+        finally:
+            conn.close()
+        return path
+
+    # =====================================================
+    # Queries
+    # =====================================================
+    def search(self, text: str = "", limit: int = 500):
+        """Macros matching every word of ``text`` (prefix match), sorted by name.
+
+        Rows have the keys ``id, path, name, groups, comments, actions,
+        keys, duration, hash``.
+        """
+        words = _WORD.findall(text.lower())
+        conn = self._connect()
+        try:
+            if not words:
+                sql = f"SELECT {_ROW} FROM macros"
+                args = []
+            elif self._fts:
+                match = " ".join(f'"{w}"*' for w in words)
+                sql = f"SELECT {_ROW} FROM macros WHERE id IN (SELECT rowid FROM macro_search WHERE macro_search MATCH ?)"
+                args = [match]
+            else:
+                where = " AND ".join("text LIKE ?" for _ in words)
+                sql = f"SELECT {_ROW} FROM macros WHERE id IN (SELECT rowid FROM macro_search WHERE {where})"
+                args = [f"%{w}%" for w in words]
+            sql += " ORDER BY name COLLATE NOCASE LIMIT ?"
+            return conn.execute(sql, args + [limit]).fetchall()
+        finally:
+            conn.close()
+
+    def __len__(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM macros").fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,235 @@
+from array import array
+from itertools import accumulate
+from operator import sub
+
+
+class MousePath:
+    """Compact storage for recorded mouse paths.
+
+    Points are kept as interleaved int32 values (x0, y0, x1, y1, ...) in an
+    ``array('i')``. Optional per-sample time deltas (milliseconds since the
+    previous sample) are kept in a parallel ``array('I')``.
+
+    Indexing and iteration yield ``(x, y)`` tuples on demand, so the path can
+    be used wherever a list of points was used before without storing one
+    tuple per point.
+    """
+
+    __slots__ = ("xy", "dt")
+
+    def __init__(self, points=None, dt=None):
+        self.xy = array("i")
+        self.dt = None if dt is None else array("I", dt)
+        if points:
+            for x, y in points:
+                self.xy.append(int(x))
+                self.xy.append(int(y))
+
+    # =====================================================
+    # Construction / conversion
+    # =====================================================
+    @classmethod
+    def from_json(cls, value):
+        """Build a path from a MousePath, ``[[x, y], ...]``, ``[[x, y, dt], ...]``
+        or the delta form written by ``to_json(delta=True)``."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls._from_delta(value)
+        path = cls()
+        if not value:
+            return path
+        if len(value[0]) > 2:
+            path.dt = array("I")
+            for x, y, dt in value:
+                path.append(x, y, dt)
+        else:
+            for x, y in value:
+                path.append(x, y)
+        return path
+
+    def to_json(self, delta: bool = False):
+        """Return a JSON-serializable list of ``[x, y]`` (or ``[x, y, dt]``) points.
+
+        With ``delta`` the path becomes ``{"delta": [x0, y0, dx1, dy1, ...]}``
+        (plus ``"dt": [...]`` for timed paths): each point is stored as the
+        difference to the previous one, which is much shorter for recorded
+        paths and compresses far better.
+        """
+        xy = self.xy
+        if delta:
+            value = {"delta": xy[:2].tolist() + list(map(sub, xy[2:], xy[:-2]))}
+            if self.dt is not None:
+                value["dt"] = self.dt.tolist()
+            return value
+        if self.dt is None:
+            return [[xy[i], xy[i + 1]] for i in range(0, len(xy), 2)]
+        dt = self.dt
+        return [[xy[2 * i], xy[2 * i + 1], dt[i]] for i in range(len(dt))]
+
+    @classmethod
+    def _from_delta(cls, value):
+        delta = array("i", value.get("delta") or ())
+        path = cls()
+        path.xy = array("i", bytes(delta.itemsize * len(delta)))
+        path.xy[0::2] = array("i", accumulate(delta[0::2]))
+        path.xy[1::2] = array("i", accumulate(delta[1::2]))
+        dt = value.get("dt")
+        path.dt = None if dt is None else array("I", dt)
+        return path
+
+    def copy(self):
+        path = MousePath()
+        path.xy = array("i", self.xy)
+        path.dt = None if self.dt is None else array("I", self.dt)
+        return path
+
+    @property
+    def timed(self) -> bool:
+        """True if every sample carries a recorded time delta."""
+        return self.dt is not None and len(self.dt) == len(self)
+
+    def offsets(self):
+        """Iterate cumulative sample offsets in milliseconds (requires ``timed``)."""
+        return accumulate(self.dt)
+
+    # =====================================================
+    # Mutation
+    # =====================================================
+    def append(self, x, y, dt=None):
+        self.xy.append(int(x))
+        self.xy.append(int(y))
+        if self.dt is not None:
+            self.dt.append(int(dt or 0))
+
+    def translated(self, dx: int = 0, dy: int = 0):
+        """Return a new path shifted by (dx, dy)."""
+        path = MousePath()
+        xy = self.xy
+        path.xy = array("i", (v + (dx if i % 2 == 0 else dy) for i, v in enumerate(xy)))
+        path.dt = None if self.dt is None else array("I", self.dt)
+        return path
+
+    # =====================================================
+    # Sequence protocol
+    # =====================================================
+    def __len__(self):
+        return len(self.xy) // 2
+
+    def __bool__(self):
+        return len(self.xy) > 0
+
+    def __iter__(self):
+        it = iter(self.xy)
+        return zip(it, it)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            path = MousePath()
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                path.xy = self.xy[2 * start:2 * stop]
+                if self.dt is not None:
+                    path.dt = self.dt[start:stop]
+            else:
+                for k in range(start, stop, step):
+                    path.append(*self[k])
+            return path
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("MousePath index out of range")
+        return self.xy[2 * i], self.xy[2 * i + 1]
+
+    def __eq__(self, other):
+        if isinstance(other, MousePath):
+            return self.xy == other.xy and self.dt == other.dt
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(
+                tuple(p) == q for p, q in zip(other, self)
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        return "[" + ", ".join(f"({x}, {y})" for x, y in self) + "]"
+
+    __str__ = __repr__
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate payload size in bytes."""
+        size = self.xy.itemsize * len(self.xy)
+        if self.dt is not None:
+            size += self.dt.itemsize * len(self.dt)
+        return size
+
+
+class PathDecimator:
+    """Streaming simplification of a timed path as samples arrive.
+
+    A sample is dropped when it and every sample skipped before it stay
+    within ``tolerance`` pixels of the straight segment between the last kept
+    point and the newest sample. Exact repeats and sub-pixel jitter therefore
+    vanish, and straight or gently curved runs collapse to their end points.
+    ``max_gap_ms`` bounds the time between kept points (about one display
+    frame by default), so speed changes along a line stay visible on replay.
+    The last sample is always kept.
+    """
+
+    def __init__(self, tolerance: float = 3.0, max_gap_ms: int = 16):
+        self.tolerance = float(tolerance)
+        self.max_gap_ms = max_gap_ms
+        self.path = MousePath(dt=())
+        self._last_ms = 0
+        self._anchor = None
+        self._candidate = None
+        self._skipped = []
+
+    def __len__(self):
+        return len(self.path) + (self._candidate is not None)
+
+    def add(self, x, y, ms: int):
+        """Feed one sample at ``ms`` milliseconds since the start of the path."""
+        x, y = int(x), int(y)
+        if self._anchor is None:
+            self._commit(x, y, ms)
+            return
+        cand = self._candidate
+        if cand is not None:
+            ax, ay = self._anchor
+            if ms - self._last_ms > self.max_gap_ms or not self._fits(ax, ay, x, y, cand):
+                self._commit(*cand)
+                self._candidate = (x, y, ms)
+                return
+            self._skipped.append((cand[0], cand[1]))
+        self._candidate = (x, y, ms)
+
+    def finish(self) -> MousePath:
+        """Flush the pending sample and return the simplified path."""
+        if self._candidate is not None:
+            self._commit(*self._candidate)
+        return self.path
+
+    def _commit(self, x, y, ms):
+        self.path.append(x, y, ms - self._last_ms)
+        self._last_ms = ms
+        self._anchor = (x, y)
+        self._candidate = None
+        self._skipped = []
+
+    def _fits(self, ax, ay, bx, by, cand) -> bool:
+        tol = self.tolerance
+        points = self._skipped + [(cand[0], cand[1])]
+        return all(_segment_distance(px, py, ax, ay, bx, by) <= tol for px, py in points)
+
+
+def _segment_distance(px, py, ax, ay, bx, by) -> float:
+    """Distance from point P to segment AB."""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    cx, cy = ax + t * dx, ay + t * dy
+    return ((px - cx) ** 2 + (py - cy) ** 2) ** 0.5
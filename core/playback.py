@@ -1,160 +1,401 @@
 from PyQt5.QtCore import QObject, pyqtSignal
-import time
-from threading import Thread
-from pynput import mouse, keyboard
+import queue
+from contextlib import nullcontext
+from threading import Thread, Event
+from core.timing import Sleeper, VirtualClock, DEFAULT_SPIN_WINDOW
+from core.backends import PynputBackend, RecordingBackend
+from core.telemetry import InstrumentedBackend
+from core.realtime import realtime_section
+from core.playback_plan import compile_plan, MoveOp, DragOp, ClickOp, ScrollOp, KeyOp
+
+# Key repeat interval while a key is held (wall seconds)
+KEY_REPEAT_INTERVAL = 0.05
+
+# Pause between steps when not in timeline mode (wall seconds)
+STEP_GAP = 0.02
+
+
+class _Abort(Exception):
+    """Unwinds the running op when a transport command ends or moves the run."""
+
+    def __init__(self, seek=None, restart=None):
+        # ``seek``: op position to continue at; ``restart``: replacing play command
+        super().__init__()
+        self.seek = seek
+        self.restart = restart
 
 
 class Playback(QObject):
-    """Handles playback of recorded mouse and keyboard actions."""
+    """Handles playback of recorded mouse and keyboard actions.
+
+    A single long-lived worker thread executes runs and is driven by a
+    command queue: ``play``, ``stop``, ``pause``, ``resume``, ``seek`` and
+    ``set_speed`` are posted from any thread and wake every wait in the
+    worker immediately, so they apply within about a millisecond.
+
+    Input is injected through an output backend (see :mod:`core.backends`),
+    pynput by default. Time comes from ``clock``, a :class:`~core.timing.Sleeper`
+    by default; pass a :class:`~core.timing.VirtualClock` to run on
+    simulated time (see :func:`simulate`).
 
-    step_signal = pyqtSignal(int, dict)
+    The action list is compiled once per run into an immutable plan of
+    typed ops (see :mod:`core.playback_plan`). Waits are expressed in plan
+    time (recorded seconds) and mapped to wall time through an anchor that
+    is moved on speed changes, pause/resume and seeks.
+    """
+
+    step_signal = pyqtSignal(int)
     done_signal = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, spin_window: float = DEFAULT_SPIN_WINDOW, backend=None, clock=None):
         super().__init__()
-        self.stop_flag = False
+        self.backend = backend if backend is not None else PynputBackend()
+        self._commands = queue.Queue()
+        self._cmd_event = Event()
+        if clock is None:
+            clock = Sleeper(spin_window)
+        clock.interrupt = self._cmd_event
+        self._sleeper = clock
+        self._now = clock.now
+        self._worker = None
+        self._serial = 0
+        self.is_active = False
+        self.is_paused = False
+        # index of the step being played, -1 when idle; polled by the GUI
+        self.position = -1
+        self.telemetry_dir = None
+        self.rt_nice = None
+        self.rt_cpu = None
+        # cap for move/drag points per wall second (0 = every recorded point)
+        self.max_rate = 0.0
+
+        self._out = None
+        self._speed = 1.0
+        self._inv = 1.0
+        self._anchor_p = 0.0
+        self._anchor_wall = 0.0
+        self._due = 0.0
+        self._ops = ()
+        self._dispatch = {
+            MoveOp: self._exec_move,
+            DragOp: self._exec_drag,
+            ClickOp: self._exec_click,
+            ScrollOp: self._exec_scroll,
+            KeyOp: self._exec_key,
+        }
 
     # =====================================================
-    # Public API
+    # Public API (any thread)
     # =====================================================
-    def play(self, actions, speed: float = 1.0, repeat: int = 1, on_done=None):
-        self.stop_flag = False
-        Thread(
-            target=self._run,
-            args=(actions, speed, repeat, on_done),
-            daemon=True,
-        ).start()
+    def play(self, actions, speed: float = 1.0, repeat: int = 1, on_done=None, timeline: bool = False,
+             start_index: int = 0, telemetry=None, realtime: bool = False):
+        """Start a run, replacing any run in progress.
+
+        With ``timeline`` every step gets an absolute deadline derived from
+        the recorded durations and ``speed``; a late step shortens the wait
+        before the next one, so errors never accumulate across steps or
+        repeats. Without it, steps run back to back with a 20 ms gap.
+        ``start_index`` seeks to that action on the first pass.
+        A :class:`~core.telemetry.Telemetry` passed as ``telemetry`` records
+        every injection; it is exported to ``telemetry_dir`` (if set) when
+        the run ends. ``realtime`` runs inside
+        :func:`~core.realtime.realtime_section` (GC frozen, optional
+        ``rt_nice`` / ``rt_cpu``) and skips ``step_signal``; progress is
+        still available through ``position``.
+        """
+        self._serial += 1
+        self.is_active = True
+        self._ensure_worker()
+        self._post(("play", self._serial, actions, speed, repeat, on_done, timeline, start_index, telemetry, realtime))
 
     def stop(self):
-        self.stop_flag = True
+        self.is_active = False
+        self._post(("stop",))
 
-    # =====================================================
-    # Core logic
-    # =====================================================
-    def _run(self, actions, speed, repeat, on_done):
-        m_ctrl = mouse.Controller()
-        k_ctrl = keyboard.Controller()
+    def pause(self):
+        self._post(("pause",))
 
-        try:
-            for loop in range(repeat if repeat > 0 else 1_000_000_000):
-                if self.stop_flag:
-                    break
+    def resume(self):
+        self._post(("resume",))
 
-                for i, act in enumerate(actions):
-                    if self.stop_flag:
-                        return
-                    if not isinstance(act, dict):
-                        continue
+    def seek(self, index: int):
+        """Jump to the action at ``index`` in the list passed to :meth:`play`."""
+        self._post(("seek", int(index)))
 
-                    action_type = act.get("type", "?")
-                    self.step_signal.emit(i, act)
+    def set_speed(self, speed: float):
+        self._post(("speed", float(speed)))
 
-                    try:
-                        if action_type == "move":
-                            self._handle_move(m_ctrl, act, speed)
-                        elif action_type == "drag":
-                            self._handle_drag(m_ctrl, act, speed)
-                        elif action_type == "click":
-                            self._handle_click(m_ctrl, act, speed)
-                        elif action_type == "key":
-                            self._handle_key(k_ctrl, act)
-                    except Exception as e:
-                        print(f"[PLAYBACK ERROR] {action_type} at step {i}: {e}")
+    # =====================================================
+    # Worker
+    # =====================================================
+    def _post(self, cmd):
+        self._commands.put(cmd)
+        self._cmd_event.set()
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._worker = Thread(target=self._work, daemon=True)
+        self._worker.start()
+
+    def _work(self):
+        while True:
+            cmd = self._commands.get()
+            while cmd and cmd[0] == "play":
+                cmd = self._run(*cmd[1:])
 
-                    time.sleep(0.02)
-                time.sleep(0.02)
+    def _run(self, serial, actions, speed, repeat, on_done, timeline, start_index, telemetry=None,
+             realtime=False):
+        """Execute one run; return a ``play`` command that replaced it, if any."""
+        restart = None
+        try:
+            self._out = backend = self.backend
+            backend.open()
+            max_rate = self.max_rate / max(float(speed), 1e-6) if self.max_rate else 0.0
+            plan = compile_plan(actions, backend.resolve_button, backend.resolve_key, max_rate)
+            if telemetry is not None:
+                self._out = InstrumentedBackend(backend, telemetry, self)
+                telemetry.begin(self._now())
+            self._set_speed(speed)
+            self.is_paused = False
+            self.position = -1
+            section = realtime_section(self.rt_nice, self.rt_cpu) if realtime else nullcontext()
+            with section:
+                restart = self._execute(plan, repeat, timeline, start_index, emit_steps=not realtime)
+        except Exception as e:
+            print(f"[PLAYBACK ERROR] {e}")
         finally:
+            self.is_paused = False
+            if telemetry is not None:
+                self._finish_telemetry(telemetry)
+            if serial == self._serial:
+                self.is_active = False
             self.done_signal.emit()
             if on_done:
                 on_done()
+        return restart
 
-    # =====================================================
-    # Handlers
-    # =====================================================
-    def _handle_move(self, m_ctrl, act, speed):
-        path = act.get("path")
-        if isinstance(path, list) and len(path) >= 2:
-            duration = float(act.get("duration", 0.0)) / max(speed, 1e-6)
-            self._play_path(m_ctrl, path, duration, speed)
-
-    def _handle_drag(self, m_ctrl, act, speed):
-        btn_name = str(act.get("button", "left")).split(".")[-1]
-        btn = getattr(mouse.Button, btn_name, mouse.Button.left)
-        path = act.get("path", [])
-        duration = float(act.get("duration", 0.0)) / max(speed, 1e-6)
-        self._play_drag(m_ctrl, btn, path, duration, speed)
-
-    def _handle_click(self, m_ctrl, act, speed):
-        btn_name = str(act.get("button", "left")).split(".")[-1]
-        btn = getattr(mouse.Button, btn_name, mouse.Button.left)
-        x, y = int(act.get("x", 0)), int(act.get("y", 0))
-        m_ctrl.position = (x, y)
-        m_ctrl.press(btn)
-        duration = float(act.get("duration", 0.05)) / max(speed, 1e-6)
-        time.sleep(duration)
-        m_ctrl.release(btn)
-
-    def _handle_key(self, k_ctrl, act):
-        key = act.get("key")
-        duration = float(act.get("duration", 0.0))
+    def _finish_telemetry(self, telemetry):
+        telemetry.end(self._now())
+        if self.telemetry_dir is None:
+            return
         try:
-            k_ctrl.press(key)
-            start = time.perf_counter()
-            while time.perf_counter() - start < duration:
-                if self.stop_flag:
-                    break
-                k_ctrl.press(key)
-                time.sleep(0.05)
-            k_ctrl.release(key)
+            telemetry.export(self.telemetry_dir)
         except Exception as e:
-            print(f"[KEY ERROR] {e}")
+            print(f"[TELEMETRY ERROR] {e}")
+
+    def _execute(self, plan, repeat, timeline, start_index=0, emit_steps=True):
+        """Run ``plan`` ``repeat`` times (0 = until stopped)."""
+        ops = plan.ops
+        if not ops:
+            return None
+        handlers = tuple(self._dispatch[type(op)] for op in ops)
+        emit = self.step_signal.emit if emit_steps else None
+        self._ops = ops
+        pos = self._op_position(ops, start_index)
+        if pos is None:
+            pos = 0
+        loop = 0
+        gap = 0.0
+        self._rebase(ops[pos].start)
+        while repeat <= 0 or loop < repeat:
+            base = loop * plan.length
+            while pos < len(ops):
+                op = ops[pos]
+                try:
+                    if not timeline:
+                        self._rebase(base + op.start, self._now() + gap)
+                        gap = STEP_GAP
+                    self._wait(base + op.start)
+                    self.position = op.index
+                    if emit is not None:
+                        emit(op.index)
+                    try:
+                        handlers[pos](op, base)
+                    except _Abort:
+                        raise
+                    except Exception as e:
+                        print(f"[PLAYBACK ERROR] {type(op).__name__} at step {op.index}: {e}")
+                except _Abort as abort:
+                    if abort.seek is None:
+                        return abort.restart
+                    pos = abort.seek
+                    gap = 0.0
+                    self._rebase(base + ops[pos].start)
+                    continue
+                pos += 1
+            loop += 1
+            pos = 0
+            gap = 2 * STEP_GAP
+        return None
+
+    @staticmethod
+    def _op_position(ops, index):
+        """Position of the first op whose action index is >= ``index``, or
+        None when ``index`` is past the last op."""
+        for pos, op in enumerate(ops):
+            if op.index >= index:
+                return pos
+        return None
 
     # =====================================================
-    # Helpers
+    # Plan clock and commands
     # =====================================================
-    def _interpolate_path(self, path, steps):
-        n = len(path)
-        if n < 2:
-            return path
-        res = []
-        for i in range(steps):
-            t = i / (steps - 1)
-            t_eased = 3 * t**2 - 2 * t**3
-            idx = int(t_eased * (n - 1))
-            res.append(path[idx])
-        return res
-
-    def _play_path(self, m_ctrl, path, duration, speed):
-        if len(path) < 2:
-            return
-        path = self._interpolate_path(path, len(path))
-        per_step = max(duration / max(len(path) - 1, 1), 0.001 / speed)
-        start = time.perf_counter()
-        for i, (x, y) in enumerate(path):
-            if self.stop_flag:
+    def _set_speed(self, speed):
+        self._speed = max(float(speed), 1e-6)
+        self._inv = 1.0 / self._speed
+
+    def _rebase(self, p, wall=None):
+        """Map plan time ``p`` to wall time ``wall`` (default: now)."""
+        self._anchor_p = p
+        self._anchor_wall = self._now() if wall is None else wall
+
+    def _plan_now(self):
+        return self._anchor_p + (self._now() - self._anchor_wall) * self._speed
+
+    def _wait(self, p):
+        """Wait until plan time ``p``, applying commands that arrive meanwhile.
+
+        Pending commands are checked even when ``p`` is already due, so a run
+        that is behind schedule still reacts to them.
+        """
+        event = self._cmd_event
+        while True:
+            if event.is_set():
+                self._apply_commands()
+            deadline = self._due = self._anchor_wall + (p - self._anchor_p) * self._inv
+            if deadline <= self._now() or self._sleeper.sleep_until(deadline):
                 return
-            m_ctrl.position = (int(x), int(y))
-            target = start + i * per_step
-            while time.perf_counter() < target:
-                time.sleep(0.0005)
-        m_ctrl.position = (int(path[-1][0]), int(path[-1][1]))
-
-    def _play_drag(self, m_ctrl, btn, path, duration, speed):
-        if len(path) < 2:
-            return
-        path = self._interpolate_path(path, len(path))
-        per_step = max(duration / max(len(path) - 1, 1), 0.005 / speed)
-        m_ctrl.position = path[0]
-        m_ctrl.press(btn)
-        time.sleep(0.015)
-        start = time.perf_counter()
-        for i, (x, y) in enumerate(path[1:], start=1):
-            if self.stop_flag:
-                m_ctrl.release(btn)
+
+    def _apply_commands(self):
+        self._cmd_event.clear()
+        while True:
+            try:
+                cmd = self._commands.get_nowait()
+            except queue.Empty:
                 return
-            m_ctrl.position = (int(x), int(y))
-            target_time = start + i * per_step
-            while time.perf_counter() < target_time:
-                time.sleep(0.0005)
-        time.sleep(0.010)
-        m_ctrl.release(btn)
+            self._apply(cmd)
+
+    def _apply(self, cmd):
+        name = cmd[0]
+        if name == "speed":
+            p = self._plan_now()
+            self._set_speed(cmd[1])
+            self._rebase(p)
+        elif name == "pause":
+            self._hold()
+        elif name == "seek":
+            pos = self._op_position(self._ops, cmd[1])
+            if pos is not None:  # seeks past the end are ignored
+                raise _Abort(seek=pos)
+        elif name == "stop":
+            raise _Abort()
+        elif name == "play":
+            raise _Abort(restart=cmd)
+
+    def _hold(self):
+        """Block while paused; keep the plan position for resume.
+
+        A seek while paused stays paused: it only moves ``position`` and
+        the run continues at the new step on resume.
+        """
+        if self.is_paused:
+            return
+        p = self._plan_now()
+        seek = None
+        self.is_paused = True
+        try:
+            while True:
+                cmd = self._commands.get()
+                name = cmd[0]
+                if name == "resume":
+                    break
+                if name == "speed":
+                    self._set_speed(cmd[1])
+                elif name == "seek":
+                    pos = self._op_position(self._ops, cmd[1])
+                    if pos is not None:
+                        seek = pos
+                        self.position = self._ops[pos].index
+                elif name != "pause":
+                    self._apply(cmd)
+        finally:
+            self.is_paused = False
+            self._cmd_event.clear()
+        if seek is not None:
+            raise _Abort(seek=seek)
+        self._rebase(p)
+
+    # =====================================================
+    # Op executors — ``base`` is the plan time of the current pass
+    # =====================================================
+    def _exec_move(self, op, base):
+        out, xy, offsets = self._out, op.xy, op.offsets
+        t0 = base + op.start
+        for i in range(len(offsets)):
+            self._wait(t0 + offsets[i])
+            out.move(xy[2 * i], xy[2 * i + 1])
+        self._wait(base + op.end)
+
+    def _exec_drag(self, op, base):
+        out, xy, offsets = self._out, op.xy, op.offsets
+        t0 = base + op.start
+        out.move(xy[0], xy[1])
+        out.press(op.button)
+        try:
+            for i in range(len(offsets)):
+                self._wait(t0 + offsets[i])
+                out.move(xy[2 * i + 2], xy[2 * i + 3])
+            self._wait(base + op.end)
+        finally:
+            out.release(op.button)
+
+    def _exec_click(self, op, base):
+        out = self._out
+        out.move(op.x, op.y)
+        out.press(op.button)
+        try:
+            self._wait(base + op.end)
+        finally:
+            out.release(op.button)
+
+    def _exec_scroll(self, op, base):
+        out = self._out
+        t0 = base + op.start
+        out.move(op.x, op.y)
+        for offset, dx, dy in op.ticks:
+            self._wait(t0 + offset)
+            out.scroll(dx, dy)
+
+    def _exec_key(self, op, base):
+        out, key = self._out, op.key
+        end = base + op.end
+        out.key_press(key)
+        try:
+            t = self._plan_now()
+            while t < end:
+                t = min(t + KEY_REPEAT_INTERVAL * self._speed, end)
+                self._wait(t)
+                if t < end:
+                    out.key_press(key)
+        finally:
+            out.key_release(key)
+
+
+def simulate(actions, speed: float = 1.0, repeat: int = 1, timeline: bool = True, start_index: int = 0,
+             telemetry=None, max_rate: float = 0.0):
+    """Play ``actions`` on a virtual clock without injecting anything.
+
+    Runs on the calling thread and returns in roughly the time it takes to
+    walk the plan. The result is a :class:`~core.backends.RecordingBackend`
+    whose timestamps are simulated seconds from the start of the run, i.e.
+    the exact event timeline a real run would aim for.
+    """
+    if repeat <= 0:
+        raise ValueError("simulate() needs a finite repeat count")
+    clock = VirtualClock()
+    backend = RecordingBackend(clock=clock)
+    pb = Playback(backend=backend, clock=clock)
+    pb.max_rate = max_rate
+    pb._run(pb._serial, actions, speed, repeat, None, timeline, start_index, telemetry)
+    return backend
@@ -0,0 +1,172 @@
+from array import array
+from typing import NamedTuple, Optional
+
+from core.mouse_path import MousePath
+from core.resample import resample_path
+
+# Fixed settle times around a drag (plan seconds)
+DRAG_PRESS_SETTLE = 0.015
+DRAG_RELEASE_SETTLE = 0.010
+
+# Lower bound between evenly spread points of untimed paths (plan seconds)
+MOVE_MIN_STEP = 0.001
+DRAG_MIN_STEP = 0.005
+
+
+# =====================================================
+# Ops
+# =====================================================
+# All times are plan seconds at speed 1.0: ``start``/``end`` are relative to
+# the start of the macro, point and tick offsets relative to ``start``.
+# The executor maps plan time to wall time by dividing by the current speed.
+
+class MoveOp(NamedTuple):
+    index: int
+    start: float
+    end: float
+    xy: array          # interleaved int32 points, ready to send
+    offsets: array     # one offset per point
+
+
+class DragOp(NamedTuple):
+    index: int
+    start: float
+    end: float          # button release
+    button: object
+    xy: array          # xy[0:2] is the press position (sent at ``start``)
+    offsets: array     # offsets for points 1..n-1
+
+
+class ClickOp(NamedTuple):
+    index: int
+    start: float
+    end: float          # button release
+    button: object
+    x: int
+    y: int
+
+
+class ScrollOp(NamedTuple):
+    index: int
+    start: float
+    end: float
+    x: int
+    y: int
+    ticks: tuple        # ((offset, dx, dy), ...)
+
+
+class KeyOp(NamedTuple):
+    index: int
+    start: float
+    end: float          # key release
+    key: object
+
+
+class Plan(NamedTuple):
+    ops: tuple
+    length: float       # plan seconds for one pass
+
+
+# =====================================================
+# Compilation
+# =====================================================
+def compile_plan(actions, resolve_button, resolve_key, max_rate: float = 0.0) -> Plan:
+    """Turn a flat action list into an immutable :class:`Plan`.
+
+    ``resolve_button`` / ``resolve_key`` map the recorded button / key names
+    to the objects the input backend expects. Each op keeps the index of its
+    action, so progress can be reported against the original list.
+    Move/drag paths are thinned out to at most ``max_rate`` points per plan
+    second (0 = keep every point) and never repeat a position.
+    """
+    ops = []
+    t = 0.0
+    for i, act in enumerate(actions):
+        if not isinstance(act, dict):
+            continue
+        try:
+            op = _compile_action(i, act, t, resolve_button, resolve_key, max_rate)
+        except Exception as e:
+            print(f"[PLAN ERROR] {act.get('type', '?')} at step {i}: {e}")
+            continue
+        if op is None:
+            continue
+        ops.append(op)
+        t = op.end
+    return Plan(tuple(ops), t)
+
+
+def _compile_action(i, act, t, resolve_button, resolve_key, max_rate):
+    action_type = act.get("type")
+    duration = float(act.get("duration", 0.0) or 0.0)
+
+    if action_type == "move":
+        path = act.get("path")
+        if not isinstance(path, (list, MousePath)) or len(path) < 2:
+            return MoveOp(i, t, t + duration, array("i"), array("d"))
+        xy, offsets = _path_points(MousePath.from_json(path), duration, MOVE_MIN_STEP, max_rate)
+        return MoveOp(i, t, t + max(duration, offsets[-1]), xy, offsets)
+
+    if action_type == "drag":
+        path = MousePath.from_json(act.get("path") or [])
+        if len(path) < 2:
+            return None
+        xy, offsets = _path_points(path, duration, DRAG_MIN_STEP, max_rate)
+        last = max(duration, offsets[-1])
+        offsets = array("d", (DRAG_PRESS_SETTLE + o for o in offsets[1:]))
+        end = t + DRAG_PRESS_SETTLE + last + DRAG_RELEASE_SETTLE
+        return DragOp(i, t, end, resolve_button(act.get("button", "left")), xy, offsets)
+
+    if action_type == "click":
+        hold = float(act.get("duration", 0.05) or 0.0)
+        return ClickOp(
+            i, t, t + hold, resolve_button(act.get("button", "left")),
+            int(act.get("x", 0)), int(act.get("y", 0)),
+        )
+
+    if action_type == "scroll":
+        ticks = act.get("ticks")
+        if ticks:
+            out, offset_ms = [], 0
+            for dt, dx, dy in ticks:
+                offset_ms += dt
+                out.append((offset_ms * 0.001, int(dx), int(dy)))
+            ticks = tuple(out)
+        else:
+            ticks = ((0.0, int(act.get("dx", 0)), int(act.get("dy", 0))),)
+        return ScrollOp(i, t, t + ticks[-1][0], int(act.get("x", 0)), int(act.get("y", 0)), ticks)
+
+    if action_type == "key":
+        key = resolve_key(act.get("key"))
+        if key is None:
+            print(f"[PLAN WARN] Unknown key {act.get('key')!r} at step {i} — skipped")
+            return None
+        return KeyOp(i, t, t + duration, key)
+
+    return None
+
+
+def _path_points(path, duration, min_step, max_rate=0.0):
+    """Return (xy, offsets) for sending ``path``.
+
+    Timed paths keep their recorded offsets. Untimed paths are spread over
+    ``duration`` with smoothstep easing, as Playback always did. Either is
+    then thinned out to ``max_rate`` (see :func:`core.resample.resample_path`).
+    """
+    xy, offsets = _raw_path_points(path, duration, min_step)
+    return resample_path(xy, offsets, max_rate)
+
+
+def _raw_path_points(path, duration, min_step):
+    n = len(path)
+    if path.timed:
+        return array("i", path.xy), array("d", (ms * 0.001 for ms in path.offsets()))
+    per_step = max(duration / max(n - 1, 1), min_step)
+    src = path.xy
+    xy = array("i")
+    for i in range(n):
+        t = i / (n - 1)
+        idx = int((3 * t**2 - 2 * t**3) * (n - 1))
+        xy.append(src[2 * idx])
+        xy.append(src[2 * idx + 1])
+    return xy, array("d", (i * per_step for i in range(n)))
@@ -0,0 +1,62 @@
+import gc
+import os
+import threading
+from contextlib import contextmanager
+
+# Generation-2 threshold while a realtime section is active (effectively never)
+GEN2_THRESHOLD = 1 << 30
+
+
+@contextmanager
+def realtime_section(nice=None, cpu=None):
+    """Run the body with as few runtime pauses as the interpreter allows.
+
+    - Collects once, then ``gc.freeze()`` moves every live object to the
+      permanent generation so later collections do not traverse them.
+    - Raises the generation-2 threshold so no full collection starts;
+      young generations keep collecting short-lived cycles.
+    - On Linux, optionally renices the calling thread (``nice``, negative
+      values need CAP_SYS_NICE) and pins it to ``cpu``.
+
+    Everything is restored on exit. The GC settings are process wide.
+    """
+    thresholds = gc.get_threshold()
+    gc.collect()
+    gc.freeze()
+    gc.set_threshold(thresholds[0], thresholds[1], GEN2_THRESHOLD)
+    restore = _tune_thread(nice, cpu)
+    try:
+        yield
+    finally:
+        restore()
+        gc.set_threshold(*thresholds)
+        gc.unfreeze()
+
+
+def _tune_thread(nice, cpu):
+    """Apply priority / affinity to the calling thread; return an undo callable."""
+    undo = []
+    if nice is not None and hasattr(os, "setpriority"):
+        try:
+            tid = threading.get_native_id()
+            old = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, nice)
+            undo.append(lambda: os.setpriority(os.PRIO_PROCESS, tid, old))
+        except OSError as e:
+            print(f"[REALTIME WARN] Could not set thread priority {nice}: {e}")
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            old_cpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, {cpu})
+            undo.append(lambda: os.sched_setaffinity(0, old_cpus))
+        except OSError as e:
+            print(f"[REALTIME WARN] Could not pin to CPU {cpu}: {e}")
+
+    def restore():
+        for fn in reversed(undo):
+            try:
+                fn()
+            except OSError:
+                pass
+
+    return restore
@@ -3,29 +3,71 @@ import uuid
 from pynput import mouse, keyboard
 from threading import Thread, Event
 from core.screen_fetcher import ScreenFetcher
+from core.mouse_path import PathDecimator
+from core.event_ring import (
+    EventRing, EV_MOVE, EV_PRESS, EV_RELEASE, EV_KEY_DOWN, EV_KEY_UP, EV_SCROLL
+)
+
+# Longest time between kept path points without a sampling cap (ms, ~one frame)
+MOVE_GAP_MS = 16
 
 
 class Recorder:
-    """Captures mouse and keyboard actions using pynput (no root required)."""
+    """Captures mouse and keyboard actions using pynput (no root required).
+
+    The pynput hook callbacks only push raw records into per-listener ring
+    buffers. A single consumer thread drains them and owns all coalescing
+    into move / drag / click / scroll / key actions.
+
+    With a ``journal``, finished actions are streamed to disk instead of
+    being kept in ``actions``, so memory stays bounded on long recordings.
 
-    def __init__(self, on_action=None, ignore_keys=None):
+    ``sample_rate`` caps move / drag sampling in Hz (0 = keep every event).
+    Samples arriving faster are skipped, but the last one before a pause or
+    another event is always kept.
+    """
+
+    def __init__(self, on_action=None, ignore_keys=None, move_tolerance=3, ring_capacity=8192,
+                 journal=None, sample_rate=0):
         self.on_action = on_action
         self.ignore_keys = ignore_keys or []
         self.is_recording = False
         self.actions = []
+        self.journal = journal
+        self.sample_rate = sample_rate
         self.screen_fetcher = ScreenFetcher()
 
         self._last_move_time = None
         self._move_buffer = None
         self._pause_threshold = 0.3
+        self._scroll_buffer = None
+        self._scroll_window = 0.25  # s between wheel ticks merged into one action
         self._stop_event = Event()
-        self._move_tolerance = 3
+        self._move_tolerance = move_tolerance  # px error bound for path decimation
+        self._sample_interval = 0.0
+        self._last_sample_time = None
+        self._held_move = None
         self._key_press_times = {}
 
+        # raw event ingestion (one ring per producer thread)
+        self._ring_capacity = ring_capacity
+        self._mouse_ring = EventRing(ring_capacity)
+        self._key_ring = EventRing(ring_capacity)
+        self._wake = Event()
+        self._dropped_reported = 0
+
+        # consumer wakeups and pause-flush lateness (seconds), for profiling
+        self.stats = {"wakeups": 0, "flushes": 0, "max_flush_lateness": 0.0}
+
         # listeners
         self.mouse_listener = None
         self.keyboard_listener = None
-        self.flush_thread = None
+        self.consumer_thread = None
+
+    @property
+    def dropped_events(self) -> int:
+        """Raw input events lost because the consumer fell behind."""
+        return self._mouse_ring.dropped + self._key_ring.dropped
 
     # =====================================================
     # Recording control
@@ -37,13 +79,35 @@ class Recorder:
         self.is_recording = True
         self.actions = []
         self._stop_event.clear()
+        self._wake.clear()
         self._last_move_time = None
         self._move_buffer = None
+        self._scroll_buffer = None
+        self._is_dragging = False
+        self._key_press_times = {}
+        self._sample_interval = 1.0 / self.sample_rate if self.sample_rate and self.sample_rate > 0 else 0.0
+        self._last_sample_time = None
+        self._held_move = None
+        self._mouse_ring = EventRing(self._ring_capacity)
+        self._key_ring = EventRing(self._ring_capacity)
+        self._dropped_reported = 0
+        self.stats = {"wakeups": 0, "flushes": 0, "max_flush_lateness": 0.0}
+
+        if self.journal:
+            try:
+                self.journal.open()
+            except OSError as e:
+                print(f"[JOURNAL ERROR] {e}")
+
+        # single consumer: coalesces raw events into actions
+        self.consumer_thread = Thread(target=self._consume, daemon=True)
+        self.consumer_thread.start()
 
         # mouse listener
         self.mouse_listener = mouse.Listener(
             on_move=self._on_move,
-            on_click=self._on_click
+            on_click=self._on_click,
+            on_scroll=self._on_scroll
         )
         self.mouse_listener.start()
 
@@ -54,17 +118,12 @@ class Recorder:
         )
         self.keyboard_listener.start()
 
-        # background thread to flush buffered moves
-        self.flush_thread = Thread(target=self._auto_flush, daemon=True)
-        self.flush_thread.start()
-
     def stop(self):
         """Stop recording cleanly and flush pending data."""
         if not self.is_recording:
             return self.actions
 
         self.is_recording = False
-        self._stop_event.set()
 
         for listener in (self.mouse_listener, self.keyboard_listener):
             try:
@@ -83,105 +142,284 @@ class Recorder:
         self.mouse_listener = None
         self.keyboard_listener = None
 
-        if self.flush_thread and self.flush_thread.is_alive():
-            self.flush_thread.join(timeout=0.5)
-        self.flush_thread = None
+        # consumer drains what is left in the rings before exiting
+        self._stop_event.set()
+        self._wake.set()
+        if self.consumer_thread and self.consumer_thread.is_alive():
+            self.consumer_thread.join(timeout=1.0)
+        self.consumer_thread = None
 
         self._move_buffer = None
         self._flush_move()
+        self._scroll_buffer = None
         self._is_dragging = False
-        self._drag_path = []
+        self._drag_path = None
+
+        if self.journal:
+            self.journal.close()
 
         return self.actions
 
+    # =====================================================
+    # Input hooks (pynput threads) — push raw records only
+    # =====================================================
+    def _on_move(self, x, y):
+        if self.is_recording:
+            self._mouse_ring.push(EV_MOVE, time.perf_counter(), int(x), int(y))
+            if not self._wake.is_set():
+                self._wake.set()
+
+    def _on_click(self, x, y, button, pressed):
+        if self.is_recording:
+            kind = EV_PRESS if pressed else EV_RELEASE
+            self._mouse_ring.push(kind, time.perf_counter(), int(x), int(y), button)
+            if not self._wake.is_set():
+                self._wake.set()
+
+    def _on_scroll(self, x, y, dx, dy):
+        if self.is_recording:
+            self._mouse_ring.push(EV_SCROLL, time.perf_counter(), int(x), int(y), (int(dx), int(dy)))
+            if not self._wake.is_set():
+                self._wake.set()
+
+    def _on_key_press(self, key):
+        if self.is_recording:
+            self._key_ring.push(EV_KEY_DOWN, time.perf_counter(), 0, 0, key)
+            if not self._wake.is_set():
+                self._wake.set()
+
+    def _on_key_release(self, key):
+        if self.is_recording:
+            self._key_ring.push(EV_KEY_UP, time.perf_counter(), 0, 0, key)
+            if not self._wake.is_set():
+                self._wake.set()
+
+    # =====================================================
+    # Consumer thread
+    # =====================================================
+    def _consume(self):
+        """Drain raw events and close move / scroll segments at their deadline.
+
+        The thread sleeps until either new input arrives or an open segment
+        reaches its deadline (``_pause_threshold`` without motion,
+        ``_scroll_window`` without wheel ticks). With no open segment it
+        blocks indefinitely, so an idle recording costs no wakeups.
+        """
+        while True:
+            deadline = self._flush_deadline()
+            timeout = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            self.stats["wakeups"] += 1
+            stopping = self._stop_event.is_set()
+
+            self._process(self._drain())
+            self._report_dropped()
+
+            if stopping:
+                # close what is still open: the held sample (it may extend a
+                # drag) and a wheel burst still inside its window
+                self._release_held_move()
+                self._flush_scroll()
+                return
+            now = time.perf_counter()
+            deadline = self._held_move_deadline()
+            if deadline is not None and now >= deadline:
+                self._release_held_move()
+            deadline = self._move_deadline()
+            if deadline is not None and now >= deadline:
+                lateness = now - deadline
+                self.stats["flushes"] += 1
+                self.stats["max_flush_lateness"] = max(self.stats["max_flush_lateness"], lateness)
+                self._flush_move(deadline)
+            deadline = self._scroll_deadline()
+            if deadline is not None and now >= deadline:
+                self._flush_scroll()
+
+    def _flush_deadline(self):
+        """Earliest time at which an open segment should be closed, or None."""
+        deadlines = [
+            d for d in (self._held_move_deadline(), self._move_deadline(), self._scroll_deadline())
+            if d is not None
+        ]
+        return min(deadlines) if deadlines else None
+
+    def _held_move_deadline(self):
+        if self._held_move:
+            return self._held_move[0] + self._sample_interval
+        return None
+
+    def _move_deadline(self):
+        if self._move_buffer and self._last_move_time is not None:
+            return self._last_move_time + self._pause_threshold
+        return None
+
+    def _scroll_deadline(self):
+        if self._scroll_buffer:
+            return self._scroll_buffer["last"] + self._scroll_window
+        return None
+
+    def _drain(self):
+        """Return pending raw records from both rings in timestamp order."""
+        mouse_events = self._mouse_ring.drain()
+        key_events = self._key_ring.drain()
+        if not key_events:
+            return mouse_events
+        if not mouse_events:
+            return key_events
+        return sorted(mouse_events + key_events, key=lambda ev: ev[1])
+
+    def _process(self, events):
+        for kind, t, x, y, arg in events:
+            try:
+                if kind == EV_MOVE:
+                    self._sample_move(t, x, y)
+                    continue
+                self._release_held_move()
+                if kind == EV_PRESS or kind == EV_RELEASE:
+                    self._handle_click(t, x, y, arg, kind == EV_PRESS)
+                elif kind == EV_SCROLL:
+                    self._handle_scroll(t, x, y, *arg)
+                elif kind == EV_KEY_DOWN:
+                    self._handle_key_press(t, arg)
+                elif kind == EV_KEY_UP:
+                    self._handle_key_release(t, arg)
+            except Exception as e:
+                print(f"[RECORDER ERROR] event {kind}: {e}")
+
+    def _sample_move(self, t, x, y):
+        """Apply the sampling-rate cap; too-early samples are held back."""
+        if self._sample_interval and self._last_sample_time is not None:
+            if t - self._last_sample_time < self._sample_interval:
+                self._held_move = (t, x, y)
+                return
+        self._held_move = None
+        self._last_sample_time = t
+        self._handle_move(t, x, y)
+
+    def _release_held_move(self):
+        """Keep the last skipped sample before a pause or a different event."""
+        held = self._held_move
+        if held:
+            self._held_move = None
+            self._last_sample_time = held[0]
+            self._handle_move(*held)
+
+    def _report_dropped(self):
+        dropped = self.dropped_events
+        if dropped != self._dropped_reported:
+            print(f"[RECORDER WARN] Consumer fell behind: {dropped - self._dropped_reported} "
+                  f"input events dropped ({dropped} total)")
+            self._dropped_reported = dropped
+
     def _emit(self, act: dict):
         """Central emit method (appends + forwards)."""
         # Ensure every action has a duration
         if "duration" not in act:
             act["duration"] = 0.0
-        self.actions.append(act)
+        if self.journal:
+            try:
+                self.journal.append(act)
+            except Exception as e:
+                print(f"[JOURNAL ERROR] {e}")
+        else:
+            self.actions.append(act)
         if self.on_action:
             self.on_action(act)
 
     # =====================================================
     # Mouse move and drag detection
     # =====================================================
-    def _on_move(self, x, y):
-        if not self.is_recording:
-            return
-
-        now = time.time()
+    def _handle_move(self, now, x, y):
         screen_name = self.screen_fetcher.get_name(x, y)
 
+        # leaving the wheel position ends a scroll burst
+        buf = self._scroll_buffer
+        if buf and (abs(x - buf["x"]) > self._move_tolerance or abs(y - buf["y"]) > self._move_tolerance):
+            self._flush_scroll()
+
         # handle drag in progress
         if getattr(self, "_is_dragging", False):
-            self._drag_path.append((x, y))
+            self._drag_path.add(x, y, self._offset_ms(now, self._drag_time_start))
             self._last_move_time = now
             return
 
         if not self._move_buffer:
-            self._move_buffer = {
-                "type": "move",
-                "path": [(x, y)],
-                "time_start": now,
-                "screen": screen_name
-            }
+            self._move_buffer = self._new_move_buffer(x, y, now, screen_name)
             self._last_move_time = now
             return
 
         if now - self._last_move_time <= self._pause_threshold and screen_name == self._move_buffer["screen"]:
-            self._move_buffer["path"].append((x, y))
+            buf = self._move_buffer
+            buf["path"].add(x, y, self._offset_ms(now, buf["time_start"]))
             self._last_move_time = now
         else:
-            self._flush_move()
-            self._move_buffer = {
-                "type": "move",
-                "path": [(x, y)],
-                "time_start": now,
-                "screen": screen_name
-            }
+            self._flush_move(now)
+            self._move_buffer = self._new_move_buffer(x, y, now, screen_name)
             self._last_move_time = now
 
-    def _flush_move(self):
+    def _new_move_buffer(self, x, y, now, screen_name):
+        path = self._new_decimator()
+        path.add(x, y, 0)
+        return {
+            "type": "move",
+            "path": path,
+            "time_start": now,
+            "screen": screen_name
+        }
+
+    def _new_decimator(self):
+        """Path simplifier for one move / drag.
+
+        Under a sampling cap the samples themselves arrive an interval or
+        more apart, so a fixed time bound between kept points would keep
+        nearly every sample and a lower cap would store more points, not
+        fewer. The bound is widened to two intervals, plus one because the
+        decimator keeps the sample *before* the first one past the bound.
+        """
+        interval_ms = 1000 * self._sample_interval
+        gap = max(MOVE_GAP_MS, 2 * interval_ms) + interval_ms
+        return PathDecimator(self._move_tolerance, gap)
+
+    @staticmethod
+    def _offset_ms(now, start):
+        return int(round((now - start) * 1000))
+
+    def _flush_move(self, now=None):
         """Flush a completed move path."""
         if not self._move_buffer or len(self._move_buffer["path"]) < 2:
             self._move_buffer = None
             return
+        path = self._move_buffer["path"].finish()
 
-        now = time.time()
+        if now is None:
+            now = time.perf_counter()
         dur = round(now - self._move_buffer["time_start"], 3)
         act = {
             "id": str(uuid.uuid4()),
             "type": "move",
-            "path": self._move_buffer["path"],
+            "path": path,
             "duration": dur,
             "screen": self._move_buffer["screen"]
         }
+        if self._sample_interval:
+            act["sample_rate"] = self.sample_rate
         self._emit(act)
         self._move_buffer = None
 
-    def _auto_flush(self):
-        while not self._stop_event.is_set():
-            time.sleep(0.1)
-            if self._move_buffer and self._last_move_time:
-                if time.time() - self._last_move_time > self._pause_threshold:
-                    self._flush_move()
-
     # =====================================================
     # Clicks and drags
     # =====================================================
-    def _on_click(self, x, y, button, pressed):
-        if not self.is_recording:
-            return
-
-        now = time.time()
+    def _handle_click(self, now, x, y, button, pressed):
         screen_name = self.screen_fetcher.get_name(x, y)
-        self._flush_move()
+        self._flush_scroll()
+        self._flush_move(now)
 
         if pressed:
             self._is_dragging = True
             self._drag_start = (x, y)
-            self._drag_path = [(x, y)]
+            self._drag_path = self._new_decimator()
+            self._drag_path.add(x, y, 0)
             self._drag_button = str(button)
             self._drag_screen = screen_name
             self._drag_time_start = now
@@ -197,10 +435,12 @@ class Recorder:
                         "id": str(uuid.uuid4()),
                         "type": "drag",
                         "button": self._drag_button,
-                        "path": self._drag_path,
+                        "path": self._drag_path.finish(),
                         "duration": dur,
                         "screen": self._drag_screen
                     }
+                    if self._sample_interval:
+                        act["sample_rate"] = self.sample_rate
                 else:
                     act = {
                         "id": str(uuid.uuid4()),
@@ -214,15 +454,60 @@ class Recorder:
                 self._emit(act)
 
             self._is_dragging = False
-            self._drag_path = []
+            self._drag_path = None
 
     # =====================================================
-    # Keyboard
+    # Scroll wheel
     # =====================================================
-    def _on_key_press(self, key):
-        if not self.is_recording:
+    def _handle_scroll(self, now, x, y, dx, dy):
+        """Merge wheel ticks arriving within ``_scroll_window`` into one action."""
+        buf = self._scroll_buffer
+        if buf and now - buf["last"] <= self._scroll_window:
+            ms = self._offset_ms(now, buf["time_start"])
+            buf["ticks"].append([ms - buf["last_ms"], dx, dy])
+            buf["last_ms"] = ms
+            buf["dx"] += dx
+            buf["dy"] += dy
+            buf["last"] = now
             return
 
+        self._flush_scroll()
+        self._flush_move(now)
+        self._scroll_buffer = {
+            "x": x,
+            "y": y,
+            "dx": dx,
+            "dy": dy,
+            "ticks": [[0, dx, dy]],
+            "time_start": now,
+            "last": now,
+            "last_ms": 0,
+            "screen": self.screen_fetcher.get_name(x, y)
+        }
+
+    def _flush_scroll(self):
+        """Emit the pending scroll burst, if any."""
+        buf = self._scroll_buffer
+        if not buf:
+            return
+        self._scroll_buffer = None
+        act = {
+            "id": str(uuid.uuid4()),
+            "type": "scroll",
+            "x": buf["x"],
+            "y": buf["y"],
+            "dx": buf["dx"],
+            "dy": buf["dy"],
+            "ticks": buf["ticks"],
+            "duration": round(buf["last"] - buf["time_start"], 3),
+            "screen": buf["screen"]
+        }
+        self._emit(act)
+
+    # =====================================================
+    # Keyboard
+    # =====================================================
+    def _handle_key_press(self, now, key):
         try:
             name = self._normalize_key(key)
             if name in self.ignore_keys:
@@ -230,22 +515,20 @@ class Recorder:
 
             # Wenn Taste schon gedrückt, ignorieren (repeats)
             if name not in self._key_press_times:
-                self._key_press_times[name] = time.perf_counter()
+                self._key_press_times[name] = now
         except Exception as e:
             print(f"[WARN] key press parse error: {e}")
 
-    def _on_key_release(self, key):
-        if not self.is_recording:
-            return
-
+    def _handle_key_release(self, now, key):
         try:
             name = self._normalize_key(key)
             if name in self.ignore_keys:
                 return
 
+            self._flush_scroll()
             press_time = self._key_press_times.pop(name, None)
             if press_time:
-                dur = round(time.perf_counter() - press_time, 3)
+                dur = round(now - press_time, 3)
             else:
                 dur = 0.0
 
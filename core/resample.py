@@ -0,0 +1,61 @@
+from array import array
+from bisect import bisect_left
+
+# Tolerance for float rounding of sample times (seconds)
+_EPS = 1e-9
+
+
+def resample_path(xy, offsets, rate: float):
+    """Thin a path out to at most ``rate`` points per second.
+
+    ``xy`` holds interleaved int points, ``offsets`` one time per point in
+    seconds from the first point (non-decreasing). Only recorded samples are
+    kept, nothing is interpolated: walking along the path, a sample is kept
+    once it is at least ``1 / rate`` after the last kept one. The first and
+    last samples are always kept, and consecutive duplicate points are
+    dropped, so the result never has more points than the input. Returns
+    ``(array('i') xy, array('d') offsets)``.
+
+    With ``rate <= 0`` or a path too short to thin, only duplicates are
+    dropped. This is decimation only: the kept samples are found with one
+    bisection each, so the cost grows with the output, not the input size.
+    """
+    n = len(offsets)
+    if rate <= 0 or n < 3 or offsets[-1] <= offsets[0]:
+        return _dedupe(xy, offsets)
+    return _dedupe(xy, offsets, _kept_indices(offsets, 1.0 / rate))
+
+
+def _kept_indices(offsets, step):
+    """Indices of the samples kept at a minimum spacing of ``step`` seconds."""
+    n = len(offsets)
+    step -= _EPS
+    keep = [0]
+    i = 0
+    while True:
+        target = offsets[i] + step
+        i += 1
+        if i < n and offsets[i] < target:  # dense input: search the rest
+            i = bisect_left(offsets, target, i + 1)
+        if i >= n - 1:
+            break
+        keep.append(i)
+    # the end point always stays; it replaces a kept sample too close before it
+    if len(keep) > 1 and offsets[-1] - offsets[keep[-1]] < step:
+        keep[-1] = n - 1
+    else:
+        keep.append(n - 1)
+    return keep
+
+
+def _dedupe(xy, offsets, indices=None):
+    out_xy, out_t = array("i"), array("d")
+    last = None
+    for i in range(len(offsets)) if indices is None else indices:
+        p = (xy[2 * i], xy[2 * i + 1])
+        if p != last:
+            out_xy.extend(p)
+            out_t.append(offsets[i])
+            last = p
+    return out_xy, out_t
+
@@ -1,34 +1,72 @@
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QObject, pyqtSignal, QPoint
-import queue
+from PyQt5.QtCore import QObject
 
 
 class ScreenFetcher(QObject):
-    """Thread-safe interface to query the screen name at a given (x, y) position."""
+    """Thread-safe interface to query the screen name at a given (x, y) position.
 
-    request_signal = pyqtSignal(float, float)
+    Screen geometries are snapshotted in the Qt (GUI) thread and refreshed
+    whenever a screen is added, removed or changes geometry. Lookups read the
+    snapshot directly, so they never wait for the GUI thread.
+    """
 
     def __init__(self):
         super().__init__()
-        self._result_queue = queue.Queue()
-        self.request_signal.connect(self._handle_request)
+        # tuple of (left, top, right, bottom, name) — replaced atomically
+        self._screens = ()
+        self._watched = set()
+
+        app = QApplication.instance()
+        if app is not None:
+            app.screenAdded.connect(self._on_screen_added)
+            app.screenRemoved.connect(self._on_screen_removed)
+            for screen in app.screens():
+                self._watch(screen)
+        self._refresh()
 
     # =====================================================
     # Public API
     # =====================================================
     def get_name(self, x: float, y: float) -> str:
         """Return the screen name for the given (x, y) coordinates."""
-        self.request_signal.emit(x, y)
-        try:
-            return self._result_queue.get(timeout=0.2)
-        except queue.Empty:
-            return "Unknown"
+        for left, top, right, bottom, name in self._screens:
+            if left <= x < right and top <= y < bottom:
+                return name
+        return "Unknown"
 
     # =====================================================
-    # Internal slot
+    # Internal slots (Qt / GUI thread)
     # =====================================================
-    def _handle_request(self, x: float, y: float):
-        """Executed in the Qt (GUI) thread."""
-        screen = QApplication.screenAt(QPoint(int(x), int(y)))
-        name = screen.name() if screen else "Unknown"
-        self._result_queue.put(name)
+    def _watch(self, screen):
+        if id(screen) in self._watched:
+            return
+        self._watched.add(id(screen))
+        screen.geometryChanged.connect(lambda _geo: self._refresh())
+
+    def _on_screen_added(self, screen):
+        self._watch(screen)
+        self._refresh()
+
+    def _on_screen_removed(self, screen):
+        self._watched.discard(id(screen))
+        self._refresh(exclude=screen)
+
+    def _refresh(self, exclude=None):
+        """Rebuild the geometry snapshot from the current screen list."""
+        app = QApplication.instance()
+        if app is None:
+            self._screens = ()
+            return
+        snapshot = []
+        for screen in app.screens():
+            if screen is exclude:
+                continue
+            geo = screen.geometry()
+            snapshot.append((
+                geo.x(),
+                geo.y(),
+                geo.x() + geo.width(),
+                geo.y() + geo.height(),
+                screen.name(),
+            ))
+        self._screens = tuple(snapshot)
@@ -1,34 +1,259 @@
+import codecs
+import gzip
+import io
 import json
+import lzma
+import os
+import re
+import stat
+import tempfile
 from pathlib import Path
 
+from core.mouse_path import MousePath
+from core import binary_format
+from core.binary_format import BINARY_SUFFIX, MAGIC
+
+COMPRESSED_SUFFIXES = (".json.gz", ".json.xz")
+SUFFIXES = (".json",) + COMPRESSED_SUFFIXES + (BINARY_SUFFIX,)
+
+# Leading bytes that identify a file's format regardless of its name
+_SIGNATURES = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (MAGIC, "binary"),
+)
+
+# Process umask, read once at import (os.umask can only be read by setting it,
+# which is not safe once the autosave thread runs)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Separators between top-level nodes of a streamed JSON array
+_GAP = re.compile(r"[\s,]*")
+
+
+def _encode(obj):
+    """json.dump hook for non-native types."""
+    if isinstance(obj, MousePath):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _encode_delta(obj):
+    """json.dump hook that writes paths delta-encoded."""
+    if isinstance(obj, MousePath):
+        return obj.to_json(delta=True)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _decode(obj):
+    """json.load hook: turn recorded paths (plain or delta) back into MousePath."""
+    path = obj.get("path")
+    if isinstance(path, (list, dict)) and obj.get("type") in ("move", "drag"):
+        obj["path"] = MousePath.from_json(path)
+    return obj
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _file_mode(path: Path) -> int:
+    """Mode for a new version of ``path``: the existing file's permissions,
+    or what a plain ``open()`` would create."""
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def _format_of(path: Path) -> str:
+    """Format to write, chosen by file name."""
+    name = path.name.lower()
+    if name.endswith(BINARY_SUFFIX):
+        return "binary"
+    if name.endswith(".json.gz"):
+        return "gzip"
+    if name.endswith(".json.xz"):
+        return "xz"
+    return "json"
+
+
+def _sniff(path: Path) -> str:
+    """Format of an existing file, detected from its first bytes."""
+    with open(path, "rb") as f:
+        head = f.read(8)
+    for signature, fmt in _SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    return "json"
+
+
+def _decompressed(fmt, raw):
+    """Wrap the binary file ``raw`` so it reads decompressed JSON bytes."""
+    if fmt == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if fmt == "xz":
+        return lzma.LZMAFile(raw, "rb")
+    return raw
+
+
+def _compressed(fmt, raw):
+    """Wrap the binary file ``raw`` so bytes written to it are compressed."""
+    if fmt == "gzip":
+        return gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=6, mtime=0)
+    if fmt == "xz":
+        return lzma.LZMAFile(raw, "wb", preset=6)
+    return raw
+
 
 class Storage:
-    """Handles saving and loading of recorded actions as JSON."""
+    """Handles saving and loading of recorded actions.
+
+    The format follows the file extension when saving: ``.json`` (indented
+    JSON), ``.json.gz`` / ``.json.xz`` (compact JSON, gzip or xz compressed)
+    or ``.pymacro`` (compact binary, see :mod:`core.binary_format`). When
+    loading, the format is detected from the file contents, and plain or
+    delta-encoded paths are both accepted.
+    """
 
     @staticmethod
-    def save(path, actions):
-        """Save actions to JSON file (overwrites existing, ensures dirs)."""
+    def save(path, actions, delta=None):
+        """Save actions to file (replaces existing atomically, ensures dirs).
+
+        The data is written to a temporary file next to ``path``, synced and
+        then renamed over it, so ``path`` always holds either the previous or
+        the new complete file. Unknown extensions are replaced by ``.json``.
+        ``delta`` writes mouse paths delta-encoded (see
+        :meth:`MousePath.to_json`); by default it is used for compressed
+        files only, so plain ``.json`` stays easy to read and edit.
+        Returns True on success.
+        """
         path = Path(path)
-        if path.suffix.lower() != ".json":
+        if not path.name.lower().endswith(SUFFIXES):
             path = path.with_suffix(".json")
+        fmt = _format_of(path)
+        if delta is None:
+            delta = fmt in ("gzip", "xz")
         path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = None
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(actions or [], f, indent=2, ensure_ascii=False)
+            fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+            with os.fdopen(fd, "wb") as raw:
+                if fmt == "binary":
+                    raw.write(binary_format.dumps(actions or []))
+                else:
+                    # indentation only for plain JSON: it is pure overhead
+                    # for compressed files and one number per line for deltas
+                    layout = {"indent": 2} if fmt == "json" and not delta else {"separators": (",", ":")}
+                    sink = _compressed(fmt, raw)
+                    f = io.TextIOWrapper(sink, encoding="utf-8")
+                    json.dump(actions or [], f, ensure_ascii=False,
+                              default=_encode_delta if delta else _encode, **layout)
+                    f.flush()
+                    f.detach()
+                    if sink is not raw:
+                        sink.close()  # finishes the compressed stream, leaves raw open
+                _sync(raw)
+            # mkstemp creates 0600 files; keep the permissions a shared macro had
+            os.chmod(tmp, _file_mode(path))
+            os.replace(tmp, path)
+            tmp = None
             print(f"[INFO] Saved: {path}")
+            return True
         except Exception as e:
             print(f"[STORAGE ERROR] Failed to save {path}: {e}")
+            return False
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
 
     @staticmethod
     def load(path):
-        """Load actions from JSON file or return empty list on failure."""
+        """Load actions from file or return empty list on failure."""
         path = Path(path)
         if not path.exists():
             print(f"[WARN] File not found: {path}")
             return []
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            fmt = _sniff(path)
+            if fmt == "binary":
+                return binary_format.loads(path.read_bytes())
+            with open(path, "rb") as raw, _decompressed(fmt, raw) as f:
+                return json.loads(f.read().decode("utf-8"), object_hook=_decode)
         except Exception as e:
             print(f"[STORAGE ERROR] Failed to load {path}: {e}")
             return []
+
+
+class MacroStream:
+    """Yields the top-level nodes of a macro file while it is being parsed.
+
+    JSON files are read in chunks and decoded one array element at a time
+    with ``JSONDecoder.raw_decode``, so the first nodes are available long
+    before the file is read completely. Binary files are decoded in one go
+    (they are small and fast to parse) and then handed out node by node.
+    Compressed JSON is decompressed on the fly. ``progress`` is the fraction
+    of the file (as stored on disk) consumed so far.
+    """
+
+    def __init__(self, path, chunk_size: int = 1 << 20):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.progress = 0.0
+
+    def __iter__(self):
+        if _sniff(self.path) == "binary":
+            return self._iter_binary()
+        return self._iter_json()
+
+    def _iter_binary(self):
+        nodes = binary_format.loads(self.path.read_bytes())
+        total = max(len(nodes), 1)
+        for i, node in enumerate(nodes):
+            self.progress = (i + 1) / total
+            yield node
+
+    def _iter_json(self):
+        decoder = json.JSONDecoder(object_hook=_decode)
+        text = codecs.getincrementaldecoder("utf-8")()
+        size = max(self.path.stat().st_size, 1)
+        with open(self.path, "rb") as raw, _decompressed(_sniff(self.path), raw) as f:
+            buf, pos, eof = "", 0, False
+            want = self.chunk_size
+            opened = False
+            while True:
+                pos = _GAP.match(buf, pos).end()
+                if pos < len(buf):
+                    if not opened:
+                        if buf[pos] != "[":
+                            raise ValueError("macro file must contain a JSON array")
+                        opened = True
+                        pos += 1
+                        continue
+                    if buf[pos] == "]":
+                        self.progress = 1.0
+                        return
+                    try:
+                        node, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    else:
+                        pos = end
+                        want = self.chunk_size
+                        yield node
+                        continue
+                elif eof:
+                    raise ValueError("unexpected end of macro file")
+                # need more input: keep the unparsed tail, grow the read for big nodes
+                data = f.read(want)
+                self.progress = min(raw.tell() / size, 1.0)
+                eof = not data
+                buf = buf[pos:] + text.decode(data, final=eof)
+                pos = 0
+                want *= 2
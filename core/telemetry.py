@@ -0,0 +1,190 @@
+import csv
+import json
+import time
+from array import array
+from pathlib import Path
+
+from core.backends import OutputBackend
+from core.event_ring import EV_MOVE, EV_PRESS, EV_RELEASE, EV_KEY_DOWN, EV_KEY_UP, EV_SCROLL
+
+EV_NAMES = {
+    EV_MOVE: "move",
+    EV_PRESS: "press",
+    EV_RELEASE: "release",
+    EV_KEY_DOWN: "key_down",
+    EV_KEY_UP: "key_up",
+    EV_SCROLL: "scroll",
+}
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class Telemetry:
+    """Per-injection timing samples of one playback run.
+
+    Every injected event (step or path point) stores the action index, the
+    event kind, the scheduled and actual clock time and the time the
+    backend call took. Samples live in preallocated arrays used as a ring:
+    once ``capacity`` is reached the oldest samples are overwritten, while
+    ``count`` and ``max_lateness`` keep covering the whole run.
+    """
+
+    def __init__(self, capacity: int = 1 << 18):
+        self.capacity = capacity
+        self._index = array("i", bytes(4 * capacity))
+        self._kind = array("b", bytes(capacity))
+        self._scheduled = array("d", bytes(8 * capacity))
+        self._actual = array("d", bytes(8 * capacity))
+        self._latency = array("d", bytes(8 * capacity))
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.max_lateness = 0.0
+        self.started = 0.0
+        self.ended = 0.0
+        self.cpu_time = 0.0
+        self._cpu0 = 0.0
+
+    # =====================================================
+    # Run hooks (playback worker thread)
+    # =====================================================
+    def begin(self, now: float):
+        self.reset()
+        self.started = now
+        self._cpu0 = time.thread_time()
+
+    def record(self, index: int, kind: int, scheduled: float, actual: float, latency: float):
+        i = self.count % self.capacity
+        self._index[i] = index
+        self._kind[i] = kind
+        self._scheduled[i] = scheduled
+        self._actual[i] = actual
+        self._latency[i] = latency
+        self.count += 1
+        late = actual - scheduled
+        if late > self.max_lateness:
+            self.max_lateness = late
+
+    def end(self, now: float):
+        self.ended = now
+        self.cpu_time = time.thread_time() - self._cpu0
+
+    # =====================================================
+    # Results
+    # =====================================================
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def samples(self):
+        """Buffered samples, oldest first, as ``(index, kind, scheduled, actual, latency)``."""
+        n = len(self)
+        first = self.count - n
+        out = []
+        for j in range(first, self.count):
+            i = j % self.capacity
+            out.append((self._index[i], self._kind[i], self._scheduled[i], self._actual[i], self._latency[i]))
+        return out
+
+    def summary(self) -> dict:
+        samples = self.samples()
+        late = sorted(s[3] - s[2] for s in samples)
+        calls = sorted(s[4] for s in samples)
+        return {
+            "samples": self.count,
+            "buffered": len(samples),
+            "duration": self.ended - self.started,
+            "cpu_time": self.cpu_time,
+            "lateness_p50": _percentile(late, 0.50),
+            "lateness_p95": _percentile(late, 0.95),
+            "lateness_p99": _percentile(late, 0.99),
+            "lateness_max": self.max_lateness,
+            "drift": samples[-1][3] - samples[-1][2] if samples else 0.0,
+            "call_p50": _percentile(calls, 0.50),
+            "call_p99": _percentile(calls, 0.99),
+        }
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(("index", "event", "scheduled", "actual", "lateness", "call_latency"))
+            for index, kind, scheduled, actual, latency in self.samples():
+                w.writerow((index, EV_NAMES.get(kind, kind), f"{scheduled - self.started:.6f}",
+                            f"{actual - self.started:.6f}", f"{actual - scheduled:.6f}", f"{latency:.6f}"))
+
+    def write_json(self, path):
+        data = {
+            "summary": self.summary(),
+            "samples": [
+                [index, EV_NAMES.get(kind, kind), scheduled - self.started, actual - self.started, latency]
+                for index, kind, scheduled, actual, latency in self.samples()
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def export(self, directory):
+        """Write ``run-<stamp>.csv`` and ``.json`` into ``directory``; return the CSV path."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = directory / time.strftime("run-%Y%m%d-%H%M%S")
+        self.write_csv(stem.with_suffix(".csv"))
+        self.write_json(stem.with_suffix(".json"))
+        s = self.summary()
+        print(f"[INFO] Telemetry: {s['samples']} events, p99 late {s['lateness_p99'] * 1e3:.3f} ms, "
+              f"drift {s['drift'] * 1e3:.3f} ms, CPU {s['cpu_time']:.2f}s -> {stem}.csv")
+        return stem.with_suffix(".csv")
+
+
+class InstrumentedBackend(OutputBackend):
+    """Wraps a backend and records a :class:`Telemetry` sample for each call.
+
+    The scheduled time is the deadline of the wait that preceded the call
+    (``Playback._due``), the action index is ``Playback.position``.
+    """
+
+    def __init__(self, inner, telemetry, playback):
+        self.inner = inner
+        self.name = inner.name
+        self._telemetry = telemetry
+        self._playback = playback
+        self._now = playback._now
+
+    def open(self):
+        self.inner.open()
+
+    def resolve_button(self, name):
+        return self.inner.resolve_button(name)
+
+    def resolve_key(self, name):
+        return self.inner.resolve_key(name)
+
+    def _timed(self, kind, call, *args):
+        now = self._now
+        t0 = now()
+        call(*args)
+        pb = self._playback
+        self._telemetry.record(pb.position, kind, pb._due, t0, now() - t0)
+
+    def move(self, x, y):
+        self._timed(EV_MOVE, self.inner.move, x, y)
+
+    def press(self, button):
+        self._timed(EV_PRESS, self.inner.press, button)
+
+    def release(self, button):
+        self._timed(EV_RELEASE, self.inner.release, button)
+
+    def scroll(self, dx, dy):
+        self._timed(EV_SCROLL, self.inner.scroll, dx, dy)
+
+    def key_press(self, key):
+        self._timed(EV_KEY_DOWN, self.inner.key_press, key)
+
+    def key_release(self, key):
+        self._timed(EV_KEY_UP, self.inner.key_release, key)
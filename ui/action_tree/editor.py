@@ -1,20 +1,30 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QAbstractItemView
-from PyQt5.QtCore import Qt, QModelIndex, pyqtSignal
+from PyQt5.QtCore import Qt, QModelIndex, QTimer, pyqtSignal
 from PyQt5.QtGui import QStandardItemModel
+import time
 import uuid
+from array import array
+from itertools import chain
 
 from ui.action_tree.context_menu import ContextMenuHandler
-from ui.action_tree.model_utils import append_action_row, renumber_all
-from ui.action_tree.json_io import export_to_json, import_from_json
-from ui.action_tree.highlight_utils import clear_highlight, highlight_action
+from ui.action_tree.model_utils import append_action_rows, last_action_number, renumber_all
+from ui.action_tree.json_io import export_to_json, import_from_json, insert_node
+from ui.action_tree.highlight_utils import clear_highlight, highlight_action, highlight_index, index_by_uid
 from ui.components.overlay import Overlay
 from ui.components.dnd_qtree_view import DnDQTreeView
 from core.config import COL_IDX, COL_TYPE, COL_TIME, COL_DETAILS, COL_COMMENT
+from core.mouse_path import MousePath
 
 
 class ActionTreeEditor(QWidget):
     # Dieses Signal wird im MainWindow verwendet
     play_request = pyqtSignal(object)
+    # streamed loading: percent done, then True if completed (False if cancelled/failed)
+    load_progress = pyqtSignal(int)
+    load_finished = pyqtSignal(bool)
+
+    # GUI time spent inserting streamed nodes per event-loop turn (seconds)
+    LOAD_SLICE = 0.012
 
     def __init__(self):
         super().__init__()
@@ -61,12 +71,35 @@ class ActionTreeEditor(QWidget):
 
         self.last_highlight_index = [None]
 
+        self._load_stream = None
+        self._load_nodes = None
+        self._load_backup = None
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self._load_step)
+
     def add_action(self, action: dict):
-        if "_uid" not in action or not action["_uid"]:
-            action["_uid"] = str(uuid.uuid4())
-        append_action_row(self.model, self.model.rowCount() + 1, action)
-        self.cleanup_empty_items()
-        renumber_all(self.model)
+        self.add_actions([action])
+
+    def add_actions(self, actions):
+        """Append a batch of recorded actions in one model insertion.
+
+        Only the new rows are numbered (continuing from the last action), so
+        the cost of a batch does not grow with the size of the tree.
+        """
+        actions = [a for a in actions if isinstance(a, dict) and a]
+        if not actions:
+            return
+        for action in actions:
+            if "_uid" not in action or not action["_uid"]:
+                action["_uid"] = str(uuid.uuid4())
+        self.tree.setUpdatesEnabled(False)
+        self._updating_model = True
+        try:
+            append_action_rows(self.model.invisibleRootItem(), last_action_number(self.model) + 1, actions)
+        finally:
+            self._updating_model = False
+            self.tree.setUpdatesEnabled(True)
 
     def clear(self):
         self.model.removeRows(0, self.model.rowCount())
@@ -74,10 +107,75 @@ class ActionTreeEditor(QWidget):
     def to_json(self):
         return export_to_json(self.model)
 
+    def snapshot(self):
+        """Tree as nodes that stay unchanged by later edits (for background saving)."""
+        return export_to_json(self.model, copy=True)
+
     def load_json(self, data):
         import_from_json(self.model, data)
         renumber_all(self.model)
 
+    def load_stream(self, stream, extra=()):
+        """Replace the tree with the nodes of ``stream`` (a MacroStream), filled in
+        time slices from the event loop; ``extra`` nodes are appended at the end.
+
+        If the load fails or is cancelled, the previous tree is put back (an
+        empty previous tree keeps the nodes loaded so far instead).
+        """
+        self.cancel_load()
+        self._load_backup = export_to_json(self.model) if self.model.rowCount() else None
+        # is_loading is already set while the old rows go away
+        self._load_stream = stream
+        self._load_nodes = chain(stream, extra)
+        self.model.removeRows(0, self.model.rowCount())
+        self._load_timer.start()
+
+    @property
+    def is_loading(self) -> bool:
+        return self._load_nodes is not None
+
+    def cancel_load(self):
+        """Stop a streamed load, keeping the nodes inserted so far."""
+        if self._load_nodes is not None:
+            print(f"[INFO] Load cancelled after {self.model.rowCount()} top-level items")
+            self._finish_load(False)
+
+    def _load_step(self):
+        deadline = time.perf_counter() + self.LOAD_SLICE
+        self.tree.setUpdatesEnabled(False)
+        try:
+            for node in self._load_nodes:
+                insert_node(self.model, self.model, node)
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                self._finish_load(True)
+                return
+        except Exception as e:
+            print(f"[LOAD ERROR] {e}")
+            self._finish_load(False)
+            return
+        finally:
+            self.tree.setUpdatesEnabled(True)
+        self.load_progress.emit(int(self._load_stream.progress * 100))
+
+    def _finish_load(self, completed: bool):
+        self._load_timer.stop()
+        backup, self._load_backup = self._load_backup, None
+        if not completed and backup is not None:
+            # still flagged as loading, so restoring is not taken for an edit
+            self.tree.setUpdatesEnabled(False)
+            try:
+                import_from_json(self.model, backup)
+            finally:
+                self.tree.setUpdatesEnabled(True)
+            print("[INFO] Previous macro restored")
+        self._load_stream = None
+        self._load_nodes = None
+        renumber_all(self.model)
+        self.load_progress.emit(100)
+        self.load_finished.emit(completed)
+
     def set_edit_lock(self, locked: bool):
         self.tree.setDragEnabled(not locked)
         self.tree.setAcceptDrops(not locked)
@@ -87,6 +185,14 @@ class ActionTreeEditor(QWidget):
     def highlight_action(self, action):
         highlight_action(self.tree, self.model, action, self.last_highlight_index)
         
+    def highlight_row(self, idx):
+        highlight_index(self.tree, self.model, idx, self.last_highlight_index)
+
+    def rows_for_actions(self, actions):
+        """Persistent row index per action (None if not in the tree), for O(1) highlighting."""
+        rows = index_by_uid(self.model)
+        return [rows.get(a.get("_uid")) if isinstance(a, dict) else None for a in actions]
+
     def clear_highlight(self):
         clear_highlight(self.tree, self.model, self.last_highlight_index)
 
@@ -102,7 +208,7 @@ class ActionTreeEditor(QWidget):
             t = act.get("type")
             if t == "move" and "path" in act:
                 self.overlay.show_move(act["path"], act.get("screen", "Unknown"))
-            elif t == "click":
+            elif t in ("click", "scroll"):
                 self.overlay.show_click(act.get("x", 0), act.get("y", 0), act.get("screen", "Unknown"))
             elif t == "drag" and "path" in act:
                 self.overlay.show_drag(act["path"], act.get("screen", "Unknown"))
@@ -241,13 +347,15 @@ class ActionTreeEditor(QWidget):
             return f"path={act.get('path', [])}"
         elif t == "click":
             return f"x={act.get('x', '?')}, y={act.get('y', '?')}"
+        elif t == "scroll":
+            return f"dx={act.get('dx', 0)}, dy={act.get('dy', 0)}"
         elif t == "key":
             return f"key={act.get('key', '?')}"
         else:
             hide = {"id", "type", "duration", "screen", "comment"}
             return ", ".join(f"{k}={v}" for k, v in act.items() if k not in hide)
 
-    def _parse_click_details(self, text: str) -> dict:
+    def _parse_click_details(self, text: str, keys=("x", "y")) -> dict:
         out = {}
         for part in text.split(","):
             if "=" not in part:
@@ -255,27 +363,45 @@ class ActionTreeEditor(QWidget):
             k, v = part.split("=", 1)
             k = k.strip().lower()
             v = v.strip()
-            if k in ("x", "y"):
+            if k in keys:
                 try:
                     out[k] = int(float(v))
                 except ValueError:
                     pass
         return out
 
-    def _parse_path_details(self, text: str):
+    def _parse_path_details(self, text: str, old=None):
+        """Parse ``path=[(x, y), ...]`` (or ``(x, y, dt)`` points). An untimed
+        edit of a timed ``old`` path keeps its timing: the same per-sample
+        deltas if the point count is unchanged, otherwise its total time
+        spread evenly over the new points."""
         import ast
         text = text.strip()
         if text.startswith("path="):
             text = text[len("path="):].strip()
         try:
             val = ast.literal_eval(text)
-            cleaned = []
+            points = []
             if isinstance(val, (list, tuple)):
                 for p in val:
-                    if (isinstance(p, (list, tuple)) and len(p) == 2 and
+                    if (isinstance(p, (list, tuple)) and len(p) in (2, 3) and
                         all(isinstance(n, (int, float)) for n in p)):
-                        cleaned.append((int(p[0]), int(p[1])))
-            return cleaned if cleaned else None
+                        points.append(p)
+            if not points:
+                return None
+            if all(len(p) == 3 for p in points):
+                return MousePath.from_json([[int(x), int(y), max(int(dt), 0)] for x, y, dt in points])
+            cleaned = MousePath((p[0], p[1]) for p in points)
+            if isinstance(old, MousePath) and old.timed and len(cleaned) > 1:
+                if len(cleaned) == len(old):
+                    cleaned.dt = old.dt[:]
+                else:
+                    total = sum(old.dt)
+                    steps = len(cleaned) - 1
+                    cleaned.dt = array("I", [0] + [
+                        (total * k) // steps - (total * (k - 1)) // steps for k in range(1, steps + 1)
+                    ])
+            return cleaned
         except Exception:
             return None
 
@@ -299,11 +425,21 @@ class ActionTreeEditor(QWidget):
 
             if col == COL_DETAILS:
                 text = item.text()
+                # itemChanged also fires for non-text changes (e.g. the
+                # playback highlight); only a changed text is an edit
+                if text == self._format_details(act):
+                    return
                 if t == "click":
                     upd = self._parse_click_details(text)
                     act.update(upd)
+                elif t == "scroll":
+                    upd = self._parse_click_details(text, keys=("dx", "dy"))
+                    if any(act.get(k, 0) != v for k, v in upd.items()):
+                        # edited totals replace the recorded tick timing
+                        act.update(upd)
+                        act.pop("ticks", None)
                 elif t in ("move", "drag"):
-                    path = self._parse_path_details(text)
+                    path = self._parse_path_details(text, act.get("path"))
                     if path is not None and len(path) >= 2:
                         act["path"] = path
 
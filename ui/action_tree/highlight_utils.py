@@ -1,5 +1,5 @@
 # ui/action_tree/highlight_utils.py
-from PyQt5.QtCore import Qt, QModelIndex
+from PyQt5.QtCore import Qt, QModelIndex, QPersistentModelIndex
 from PyQt5.QtGui import QBrush, QColor
 from core.config import COL_TYPE
 
@@ -13,6 +13,13 @@ def highlight_action(tree, model, action: dict, last_highlight_index_ref):
     idx = _find_index_by_uid(model, uid)
     if not idx or not idx.isValid():
         return
+    highlight_index(tree, model, idx, last_highlight_index_ref)
+
+def highlight_index(tree, model, idx, last_highlight_index_ref):
+    if isinstance(idx, QPersistentModelIndex):
+        idx = QModelIndex(idx)
+    if not idx.isValid():
+        return
     _clear_previous_brush(model, last_highlight_index_ref)
     _set_row_background(model, idx, QColor(180, 220, 255))
     last_highlight_index_ref[0] = idx
@@ -41,6 +48,27 @@ def _set_row_background(model, idx: QModelIndex, color: QColor = None):
         if it:
             it.setBackground(brush)
 
+def index_by_uid(model):
+    """Map every action ``_uid`` to a persistent index of its row, in one walk."""
+    out = {}
+
+    def walk(item):
+        for r in range(item.rowCount()):
+            t_item = item.child(r, COL_TYPE)
+            if not t_item:
+                continue
+            kind = t_item.data(Qt.UserRole)
+            if kind == "action":
+                data = t_item.data(Qt.UserRole + 1)
+                col0 = item.child(r, 0)
+                if isinstance(data, dict) and data.get("_uid") and col0:
+                    out[data["_uid"]] = QPersistentModelIndex(col0.index())
+            elif kind == "__group__":
+                walk(item.child(r, 0))
+
+    walk(model.invisibleRootItem())
+    return out
+
 def _find_index_by_uid(model, uid: str):
     root = model.invisibleRootItem()
     return _walk_find_uid(root, uid)
@@ -4,7 +4,10 @@ from core.config import COL_TYPE
 from ui.action_tree.model_utils import append_action_row, append_group_row
 
 
-def export_to_json(model):
+def export_to_json(model, copy=False):
+    """Serialize the tree to nodes. With ``copy`` every action/group dict is a
+    shallow copy, giving a snapshot that later edits in the tree don't touch
+    (edits replace values such as paths, they never mutate them)."""
     root = model.invisibleRootItem()
 
     def serialize(item):
@@ -19,7 +22,7 @@ def export_to_json(model):
             if kind == "__group__":
                 nodes.append({
                     "kind": "__group__",
-                    "data": data,
+                    "data": dict(data) if copy and isinstance(data, dict) else data,
                     "children": serialize(item.child(r, 0))
                 })
             elif kind == "action":
@@ -27,7 +30,7 @@ def export_to_json(model):
                     data["_uid"] = str(uuid.uuid4())
                 nodes.append({
                     "kind": "action",
-                    "data": data
+                    "data": dict(data) if copy and isinstance(data, dict) else data
                 })
         return nodes
 
@@ -36,21 +39,22 @@ def export_to_json(model):
 
 def import_from_json(model, data):
     model.removeRows(0, model.rowCount())
+    for n in data:
+        insert_node(model, model, n)
 
-    def insert(parent, node):
-        kind = node.get("kind")
-        data = node.get("data", {}) or {}
 
-        if kind == "action":
-            if "_uid" not in data:
-                data["_uid"] = str(uuid.uuid4())
-            append_action_row(parent, parent.rowCount() + 1, data)
+def insert_node(model, parent, node):
+    """Append one exported node (action or group with children) to ``parent``."""
+    kind = node.get("kind")
+    data = node.get("data", {}) or {}
 
-        elif kind == "__group__":
-            grp_idx = append_group_row(parent, data.get("name", "Group"), data.get("comment", ""))
-            g_item = model.itemFromIndex(grp_idx)
-            for c in node.get("children", []):
-                insert(g_item, c)
+    if kind == "action":
+        if "_uid" not in data:
+            data["_uid"] = str(uuid.uuid4())
+        append_action_row(parent, parent.rowCount() + 1, data)
 
-    for n in data:
-        insert(model, n)
+    elif kind == "__group__":
+        grp_idx = append_group_row(parent, data.get("name", "Group"), data.get("comment", ""))
+        g_item = model.itemFromIndex(grp_idx)
+        for c in node.get("children", []):
+            insert_node(model, g_item, c)
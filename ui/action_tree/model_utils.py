@@ -1,24 +1,28 @@
 from PyQt5.QtGui import QStandardItem, QBrush, QColor, QFont
 from PyQt5.QtCore import Qt
 from core.config import COL_IDX, COL_TYPE
+from core.mouse_path import MousePath
 
 
 # =====================================================
 # BASIC ROW BUILDERS
 # =====================================================
-def append_action_row(parent, idx: int, act: dict):
+def build_action_row(idx: int, act: dict):
+    """Return the column items for one action row."""
     t = act.get("type", "")
     duration_str = f"{act.get('duration', 0.0):.3f}"
     details = ""
 
     if t in ("move", "drag") and "path" in act:
         path = act["path"]
-        if isinstance(path, list):
+        if isinstance(path, (list, MousePath)):
             details = f"path={path}"
         else:
             details = f"path=[{path}]"
     elif t == "click":
         details = f"x={act.get('x', '?')}, y={act.get('y', '?')}"
+    elif t == "scroll":
+        details = f"dx={act.get('dx', 0)}, dy={act.get('dy', 0)}"
     elif t == "key":
         details = f"key={act.get('key', '?')}"
     else:
@@ -41,7 +45,35 @@ def append_action_row(parent, idx: int, act: dict):
     items[COL_TYPE].setData("action", Qt.UserRole)
     items[COL_TYPE].setData(act, Qt.UserRole + 1)
 
-    parent.appendRow(items)
+    return items
+
+
+def append_action_row(parent, idx: int, act: dict):
+    parent.appendRow(build_action_row(idx, act))
+
+
+def append_action_rows(parent, first_idx: int, actions):
+    """Append several action rows to ``parent`` with a single row insertion.
+
+    The cells are filled with the model's signals blocked and announced by a
+    single ``dataChanged`` afterwards, so filling them never shows up as an
+    ``itemChanged`` edit (which would re-parse the details text).
+    """
+    if not actions:
+        return
+    model = parent.model()
+    start = parent.rowCount()
+    parent.insertRows(start, len(actions))
+    blocked = model.blockSignals(True)
+    try:
+        for offset, act in enumerate(actions):
+            for c, it in enumerate(build_action_row(first_idx + offset, act)):
+                parent.setChild(start + offset, c, it)
+    finally:
+        model.blockSignals(blocked)
+    last = start + len(actions) - 1
+    model.dataChanged.emit(parent.child(start, 0).index(),
+                           parent.child(last, parent.columnCount() - 1).index())
 
 def append_group_row(parent, name="Group", comment=""):
     items = [
@@ -71,6 +103,31 @@ def delete_selected(model, tree):
     renumber_all(model)
 
 
+def last_action_number(model) -> int:
+    """Number shown on the last action in the tree (0 if there is none).
+
+    Relies on the numbering kept by :func:`renumber_all`; walks back from
+    the end, so it usually touches only a few rows.
+    """
+    def walk(item):
+        for r in range(item.rowCount() - 1, -1, -1):
+            t = item.child(r, COL_TYPE)
+            if not t:
+                continue
+            if t.data(Qt.UserRole) == "__group__":
+                found = walk(item.child(r, 0))
+                if found is not None:
+                    return found
+            elif t.data(Qt.UserRole) == "action":
+                try:
+                    return int(item.child(r, COL_IDX).text())
+                except (AttributeError, ValueError):
+                    return None
+        return None
+
+    return walk(model.invisibleRootItem()) or 0
+
+
 def renumber_all(model):
     count = 1
     root = model.invisibleRootItem()
@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QWidget, QApplication
 from PyQt5.QtGui import QPainter, QColor, QPen, QBrush
 from PyQt5.QtCore import Qt, QRectF, QTimer
+from core.mouse_path import MousePath
 
 
 class Overlay(QWidget):
@@ -51,6 +52,7 @@ class Overlay(QWidget):
     def show_move(self, path, screen_name="Unknown"):
         if not self.enabled:
             return
+        path = MousePath.from_json(path)
         self._data = ("move", path)
         self._screen_name = screen_name
         found_geo = self._move_to_screen(screen_name)
@@ -59,7 +61,7 @@ class Overlay(QWidget):
             print(f"[WARN] Screen '{screen_name}' not found — using primary.")
         else:
             y_offset = found_geo.y()
-            adjusted_path = [(x, y - y_offset) for x, y in path]
+            adjusted_path = path.translated(0, -y_offset)
             self._data = ("move", adjusted_path)
         self.show()
         self.repaint()
@@ -84,6 +86,7 @@ class Overlay(QWidget):
     def show_drag(self, path, screen_name="Unknown"):
         if not self.enabled:
             return
+        path = MousePath.from_json(path)
         self._data = ("drag", path)
         self._screen_name = screen_name
         found_geo = self._move_to_screen(screen_name)
@@ -91,12 +94,17 @@ class Overlay(QWidget):
             print(f"[WARN] Screen '{screen_name}' not found — using primary.")
         else:
             y_offset = found_geo.y()
-            adjusted_path = [(x, y - y_offset) for x, y in path]
+            adjusted_path = path.translated(0, -y_offset)
             self._data = ("drag", adjusted_path)
         self.show()
         self.repaint()
         QTimer.singleShot(self.show_Time, self.hide)
 
+    def _draw_polyline(self, qp, path):
+        xy = path.xy
+        for i in range(2, len(xy), 2):
+            qp.drawLine(xy[i - 2], xy[i - 1], xy[i], xy[i + 1])
+
     def hide(self):
         super().hide()
         self._data = None
@@ -117,10 +125,7 @@ class Overlay(QWidget):
                 if len(path) > 1:
                     pen = QPen(QColor(255, 0, 0, 180), 3)
                     qp.setPen(pen)
-                    for i in range(1, len(path)):
-                        x1, y1 = path[i - 1]
-                        x2, y2 = path[i]
-                        qp.drawLine(int(x1), int(y1), int(x2), int(y2))
+                    self._draw_polyline(qp, path)
                     x2, y2 = path[-1]
                     qp.setBrush(QBrush(QColor(255, 0, 0, 120)))
                     qp.drawEllipse(QRectF(x2 - 5, y2 - 5, 10, 10))
@@ -135,10 +140,7 @@ class Overlay(QWidget):
                 if len(path) > 1:
                     pen = QPen(QColor(255, 200, 0, 220), 3, Qt.DashLine)
                     qp.setPen(pen)
-                    for i in range(1, len(path)):
-                        x1, y1 = path[i - 1]
-                        x2, y2 = path[i]
-                        qp.drawLine(int(x1), int(y1), int(x2), int(y2))
+                    self._draw_polyline(qp, path)
 
                     x1, y1 = path[0]
                     qp.setBrush(QBrush(QColor(255, 0, 0, 180)))
@@ -1,18 +1,30 @@
 import os
+import time
+from collections import deque
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QFileDialog, QFrame, QHBoxLayout, QPushButton, QStyle
+    QWidget, QVBoxLayout, QFileDialog, QFrame, QHBoxLayout, QPushButton, QStyle, QProgressDialog,
+    QInputDialog, QMessageBox
 )
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, QMetaObject, Qt
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QMetaObject, Qt, QTimer
 from PyQt5 import QtGui, QtWidgets
 from pynput import keyboard
 
 from ui.action_tree.editor import ActionTreeEditor
 from ui.panels.control_panel import ControlPanel
+from ui.panels.library_panel import LibraryPanel
 from ui.components.gui_style import APP_STYLE
 from core.recorder import Recorder
 from core.playback import Playback
-from core.storage import Storage
-from core.config import IGNORE_KEYS, AUTOSAVE_PATH
+from core.storage import Storage, MacroStream, COMPRESSED_SUFFIXES
+from core.autosave import Autosaver
+from core.binary_format import BINARY_SUFFIX
+from core.journal import Journal
+from core.library import MacroLibrary
+from core.telemetry import Telemetry
+from core.config import (
+    IGNORE_KEYS, AUTOSAVE_PATH, AUTOSAVE_DELAY_MS, AUTOSAVE_MAX_DELAY_MS, JOURNAL_PATH, TELEMETRY_DIR, REALTIME_NICE, REALTIME_CPU,
+    PLAYBACK_MAX_RATE, COL_TYPE, LIBRARY_DIR, LIBRARY_INDEX_PATH
+)
 
 # --- Fix für Wine & Font Rendering ---
 QtWidgets.QApplication.setStyle("Fusion")
@@ -28,10 +40,14 @@ palette.setColor(QtGui.QPalette.WindowText, QtGui.QColor("#E5E6EB"))
 palette.setColor(QtGui.QPalette.Text, QtGui.QColor("#E5E6EB"))
 QtWidgets.QApplication.setPalette(palette)
 
+SAVE_FILTERS = (f"JSON Files (*.json);;Compressed JSON (*.json.gz *.json.xz);;"
+                f"Binary Macros (*{BINARY_SUFFIX})")
+OPEN_FILTERS = f"Macro Files (*.json *.json.gz *.json.xz *{BINARY_SUFFIX});;{SAVE_FILTERS}"
+
+
 class MainWindow(QWidget):
     highlight_signal = pyqtSignal(int)
-    play_done_signal = pyqtSignal()
-    action_signal = pyqtSignal(dict)
+    autosave_done = pyqtSignal(bool, object)
 
     def __init__(self):
         super().__init__()
@@ -41,14 +57,53 @@ class MainWindow(QWidget):
 
         # === Core-Komponenten ===
         self.playback = Playback()
-        self.playback.step_signal.connect(self._on_playback_step)
-        self.playback.done_signal.connect(self.stop_play)
+        self.playback.done_signal.connect(self._on_play_done)
+        self.playback.telemetry_dir = TELEMETRY_DIR
+        self.playback.rt_nice = REALTIME_NICE
+        self.playback.rt_cpu = REALTIME_CPU
+        self.playback.max_rate = PLAYBACK_MAX_RATE
         self.play_start_offset = 0
-        self.recorder = Recorder(on_action=self.action_signal.emit, ignore_keys=IGNORE_KEYS)
+        # playback progress is polled once per display frame; only the
+        # latest step is highlighted
+        self._play_rows = []
+        self._shown_step = -1
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(16)
+        self._progress_timer.timeout.connect(self._show_progress)
+        # recorded actions are queued by the recorder thread and delivered
+        # to the tree in batches, at most once per display frame
+        self._action_queue = deque()
+        self._action_timer = QTimer(self)
+        self._action_timer.setInterval(16)
+        self._action_timer.timeout.connect(self._deliver_actions)
+        self.journal = Journal(JOURNAL_PATH)
+        # autosave: model edits are debounced on the GUI thread, snapshots
+        # are written by a worker thread
+        self.autosaver = Autosaver(AUTOSAVE_PATH, on_saved=self.autosave_done.emit)
+        self.autosave_done.connect(self._on_autosaved)
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self._autosave_timer.timeout.connect(self._autosave)
+        self._dirty_since = None
+        self._revision = 0
+        self._saved_revision = 0
+        self._record_serial = 0
+        self.recorder = Recorder(
+            on_action=self._action_queue.append,
+            ignore_keys=IGNORE_KEYS,
+            journal=self.journal,
+        )
 
         # === States ===
-        self.actions = []
+        self._last_action = None
         self.is_playing = False
+        self.is_paused = False
+        self._load_dialog = None
+        self._loading_autosave = False
+        self._pending_recovery = False
+        # False while the tree may hold only part of the autosave
+        self._autosave_ok = True
 
         # === Layout ===
         layout = QVBoxLayout()
@@ -59,6 +114,12 @@ class MainWindow(QWidget):
         self.action_tree = ActionTreeEditor()
         self.action_tree.overlay.enable(True)
         self.action_tree.play_request.connect(self._on_play_request)
+        self.action_tree.load_finished.connect(self._on_load_finished)
+        model = self.action_tree.model
+        model.rowsInserted.connect(self._schedule_autosave)
+        model.rowsRemoved.connect(self._schedule_autosave)
+        model.rowsMoved.connect(self._schedule_autosave)
+        model.dataChanged.connect(self._on_model_data_changed)
         layout.addWidget(self.action_tree)
 
         # === Divider ===
@@ -78,21 +139,34 @@ class MainWindow(QWidget):
 
         self.btn_load = QPushButton("Load Macro")
         self.btn_load.setIcon(self.style().standardIcon(QStyle.SP_DirOpenIcon))
-        for b in (self.btn_save, self.btn_load):
+        self.btn_library = QPushButton("Library")
+        self.btn_library.setCheckable(True)
+        self.btn_library.setIcon(self.style().standardIcon(QStyle.SP_FileDialogContentsView))
+        for b in (self.btn_save, self.btn_load, self.btn_library):
             b.setFixedHeight(34)
             b.setStyleSheet("font-weight: 500;")
         file_row.addWidget(self.btn_save)
         file_row.addWidget(self.btn_load)
+        file_row.addWidget(self.btn_library)
         layout.addLayout(file_row)
+
+        # === Macro Library ===
+        self.library = MacroLibrary(LIBRARY_DIR, LIBRARY_INDEX_PATH)
+        self.library_panel = LibraryPanel(self.library)
+        self.library_panel.setVisible(False)
+        layout.addWidget(self.library_panel)
         self.setLayout(layout)
 
         # === Signal-Verbindungen ===
-        self.action_signal.connect(self._on_new_action)
-        self.play_done_signal.connect(self.stop_play)
         self.controls.btn_record.clicked.connect(self.toggle_record)
         self.controls.btn_play.clicked.connect(self.toggle_play)
+        self.controls.btn_pause.clicked.connect(self.toggle_pause)
+        self.controls.speed_box.valueChanged.connect(self._on_speed_changed)
         self.btn_save.clicked.connect(self.save_macro)
         self.btn_load.clicked.connect(self.load_macro)
+        self.btn_library.toggled.connect(self.toggle_library)
+        self.library_panel.open_requested.connect(self.open_macro)
+        self.library_panel.add_requested.connect(self.add_to_library)
 
         # === Global Hotkeys ===
         self.global_listener = keyboard.Listener(on_press=self._on_global_key)
@@ -110,6 +184,8 @@ class MainWindow(QWidget):
                 QMetaObject.invokeMethod(self, "toggle_record", Qt.QueuedConnection)
             elif key == keyboard.Key.f10:
                 QMetaObject.invokeMethod(self, "toggle_play", Qt.QueuedConnection)
+            elif key == keyboard.Key.f11:
+                QMetaObject.invokeMethod(self, "toggle_pause", Qt.QueuedConnection)
         except Exception as e:
             print(f"[HOTKEY ERROR] {e}")
 
@@ -128,7 +204,11 @@ class MainWindow(QWidget):
             self.stop_play()
 
         try:
+            self._record_serial += 1
+            self._action_queue.clear()
+            self.recorder.sample_rate = self.controls.rate_box.value()
             self.recorder.start()
+            self._action_timer.start()
             self._update_ui_state(recording=True)
             self.action_tree.overlay.enable(False) 
         except Exception as e:
@@ -140,16 +220,27 @@ class MainWindow(QWidget):
             self.recorder.stop()
         except Exception as e:
             print(f"[RECORD STOP ERROR] {e}")
+        self._action_timer.stop()
+        # the recorder's final drain in stop() may have queued more actions
+        self._deliver_actions()
+        self._schedule_autosave()
         self._update_ui_state(recording=False)
         self.action_tree.overlay.enable(True) 
 
-    def _on_new_action(self, action):
-        if not self.recorder.is_recording:
-            return
-        if self.actions and action == self.actions[-1]:
+    def _deliver_actions(self):
+        """Move all queued recorder actions into the tree as one batch."""
+        if not self._action_queue:
             return
-        self.action_tree.add_action(action)
-        self.actions.append(action)
+        batch = []
+        while self._action_queue:
+            action = self._action_queue.popleft()
+            last = batch[-1] if batch else self._last_action
+            if last is not None and action == last:
+                continue
+            batch.append(action)
+        self.action_tree.add_actions(batch)
+        if batch:
+            self._last_action = batch[-1]
 
     # =====================================================
     # PLAYBACK
@@ -160,7 +251,14 @@ class MainWindow(QWidget):
 
         if isinstance(payload, tuple):
             actions, start_idx = payload
-            start_offset = self.action_tree.get_action_index_from_model_index(start_idx)
+            kind = start_idx.sibling(start_idx.row(), COL_TYPE).data(Qt.UserRole)
+            if kind == "action":
+                # play the whole macro and seek to the clicked step, so
+                # repeats loop over everything
+                actions = None
+                start_offset = self.action_tree.get_action_index_from_model_index(start_idx) or 0
+            else:
+                start_offset = 0
         else:
             actions = payload
             start_offset = 0
@@ -172,7 +270,9 @@ class MainWindow(QWidget):
         if self.is_playing:
             self.stop_play()
             return
-        
+        if isinstance(actions, bool):
+            actions = None  # QPushButton.clicked(checked)
+
         def _flatten(nodes):
             result = []
             for n in nodes:
@@ -216,18 +316,27 @@ class MainWindow(QWidget):
 
         try:
             self.is_playing = True
+            self.is_paused = False
             self._update_ui_state()
 
             speed = self.controls.speed_box.value()
             repeat = self.controls.repeat_box.value()
+            timeline = self.controls.timeline_box.isChecked()
+            telemetry = Telemetry() if self.controls.telemetry_box.isChecked() else None
             self.action_tree.clear_highlight()
+            self._play_rows = self.action_tree.rows_for_actions(actions)
+            self._shown_step = -1
 
             self.playback.play(
                 actions,
                 speed=speed,
                 repeat=repeat,
-                on_done=lambda: self.play_done_signal.emit()
+                timeline=timeline,
+                start_index=start_offset,
+                telemetry=telemetry,
+                realtime=self.controls.realtime_box.isChecked(),
             )
+            self._progress_timer.start()
             self.action_tree.overlay.enable(False) 
         except Exception as e:
             print(f"[PLAYBACK ERROR] {e}")
@@ -238,13 +347,42 @@ class MainWindow(QWidget):
             self.playback.stop()
         except Exception as e:
             print(f"[PLAY STOP ERROR] {e}")
+        self._show_progress()
+        self._progress_timer.stop()
+        self._play_rows = []
         self.is_playing = False
+        self.is_paused = False
         self._update_ui_state()
         self.action_tree.overlay.enable(True) 
 
-    @pyqtSlot(int, dict)
-    def _on_playback_step(self, index, action):
-        self.action_tree.highlight_action(action)
+    def _on_play_done(self):
+        # ignore the end of a run that was already stopped or replaced
+        if self.is_playing and not self.playback.is_active:
+            self.stop_play()
+
+    @pyqtSlot()
+    def toggle_pause(self):
+        if not self.is_playing:
+            return
+        if self.is_paused:
+            self.playback.resume()
+        else:
+            self.playback.pause()
+        self.is_paused = not self.is_paused
+        self._update_ui_state()
+
+    def _on_speed_changed(self, speed):
+        if self.is_playing:
+            self.playback.set_speed(speed)
+
+    def _show_progress(self):
+        index = self.playback.position
+        if index < 0 or index == self._shown_step or index >= len(self._play_rows):
+            return
+        self._shown_step = index
+        row = self._play_rows[index]
+        if row is not None:
+            self.action_tree.highlight_row(row)
 
     # =====================================================
     # STATE MANAGEMENT
@@ -259,6 +397,8 @@ class MainWindow(QWidget):
         # === Buttons ===
         self.controls.btn_record.setText("⏹ Stop (F9)" if rec else "⏺ Record (F9)")
         self.controls.btn_play.setText("⏹ Stop (F10)" if play else "▶ Play (F10)")
+        self.controls.btn_pause.setText("▶ Resume (F11)" if self.is_paused else "⏸ Pause (F11)")
+        self.controls.btn_pause.setEnabled(play)
 
         # === Lock Tree ===
         locked = rec or play
@@ -268,27 +408,130 @@ class MainWindow(QWidget):
     # SAVE / LOAD / AUTOSAVE
     # =====================================================
     def _autoload(self):
-        if not os.path.exists(AUTOSAVE_PATH):
+        recovered = self._recover_journal()
+        if os.path.exists(AUTOSAVE_PATH):
+            self._loading_autosave = True
+            self._pending_recovery = bool(recovered)
+            self._autosave_ok = False
+            self._start_load(MacroStream(AUTOSAVE_PATH), recovered)
             return
-        try:
-            data = Storage.load(AUTOSAVE_PATH)
-            if isinstance(data, list) and data:
-                self.action_tree.load_json(data)
-        except Exception as e:
-            print(f"[AUTOLOAD ERROR] {e}")
+        if recovered:
+            self.action_tree.load_json(recovered)
+            self._autosave()
+
+    def _start_load(self, stream, extra=()):
+        """Stream a macro into the tree with a cancellable progress dialog."""
+        dialog = QProgressDialog(f"Loading {stream.path.name} …", "Cancel", 0, 100, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(300)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.canceled.connect(self.action_tree.cancel_load)
+        self.action_tree.load_progress.connect(dialog.setValue)
+        self._load_dialog = dialog
+        self.action_tree.set_edit_lock(True)
+        self.action_tree.load_stream(stream, extra)
+
+    def _on_load_finished(self, completed):
+        dialog, self._load_dialog = self._load_dialog, None
+        if dialog is not None:
+            self.action_tree.load_progress.disconnect(dialog.setValue)
+            dialog.canceled.disconnect(self.action_tree.cancel_load)
+            dialog.close()
+            dialog.deleteLater()
+        self._update_ui_state()
+
+        if self._loading_autosave:
+            self._loading_autosave = False
+            self._autosave_ok = completed
+            if not completed:
+                print("[WARN] Autosave only partly loaded — it will not be overwritten")
+            elif self._pending_recovery:
+                self._autosave()
+            else:
+                self._saved_revision = self._revision
+            self._pending_recovery = False
+        elif completed:
+            self._autosave_ok = True
+            self._schedule_autosave()
+
+    def _on_model_data_changed(self, top_left, bottom_right, roles=()):
+        if roles and all(r == Qt.BackgroundRole for r in roles):
+            return  # playback highlight
+        self._schedule_autosave()
+
+    def _schedule_autosave(self, *_):
+        if self.action_tree.is_loading:
+            return
+        self._revision += 1
+        if self.recorder.is_recording:
+            # the journal covers the session; stop_record schedules the save
+            return
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        # restart the quiet period, unless edits have kept it going too long
+        if not self._autosave_timer.isActive() or (now - self._dirty_since) * 1000 < AUTOSAVE_MAX_DELAY_MS:
+            self._autosave_timer.start()
+
+    def _autosave(self):
+        """Hand a snapshot of the tree to the background autosaver."""
+        self._dirty_since = None
+        if not self._autosave_ok or self.action_tree.is_loading:
+            return
+        # never while recording: a snapshot holding part of the session next
+        # to a kept journal would be recovered twice after a crash
+        if self.recorder.is_recording:
+            return
+        self.autosaver.submit(self.action_tree.snapshot(), (self._revision, self._record_serial))
+
+    def _on_autosaved(self, ok, token):
+        if not ok:
+            return
+        revision, serial = token
+        self._saved_revision = max(self._saved_revision, revision)
+        if serial == self._record_serial and not self.recorder.is_recording:
+            self.journal.discard()
+
+    def _recover_journal(self):
+        """Turn unsaved journal sessions into one group per recording."""
+        nodes = []
+        for started, actions in Journal.recover(JOURNAL_PATH):
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(started)) if started else "?"
+            nodes.append({
+                "kind": "__group__",
+                "data": {"name": f"Recovered {stamp}", "comment": "restored from journal"},
+                "children": [{"kind": "action", "data": a} for a in actions],
+            })
+            print(f"[INFO] Recovered {len(actions)} actions from journal ({stamp})")
+        return nodes
 
     def closeEvent(self, event):
         try:
-            data = self.action_tree.to_json()
-            Storage.save(AUTOSAVE_PATH, data)
+            if self.recorder.is_recording:
+                self.stop_record()
+            if self.action_tree.is_loading:
+                self.action_tree.cancel_load()
+            self._autosave_timer.stop()
+            self.autosaver.stop()
+            if self._autosave_ok and self._revision != self._saved_revision:
+                data = self.action_tree.to_json()
+                if Storage.save(AUTOSAVE_PATH, data):
+                    self.journal.discard()
+            elif self._autosave_ok:
+                self.journal.discard()
         except Exception as e:
             print(f"[AUTOSAVE ERROR] {e}")
         event.accept()
 
     def save_macro(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Save Macro", "", "JSON Files (*.json)")
+        path, selected = QFileDialog.getSaveFileName(self, "Save Macro", "", SAVE_FILTERS)
         if not path:
             return
+        if selected.startswith("Binary") and not path.lower().endswith(BINARY_SUFFIX):
+            path += BINARY_SUFFIX
+        elif selected.startswith("Compressed") and not path.lower().endswith(COMPRESSED_SUFFIXES):
+            path += ".gz" if path.lower().endswith(".json") else ".json.gz"
         try:
             data = self.action_tree.to_json()
             Storage.save(path, data)
@@ -296,12 +539,43 @@ class MainWindow(QWidget):
             print(f"[SAVE ERROR] {e}")
 
     def load_macro(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Load Macro", "", "JSON Files (*.json)")
-        if not path:
+        path, _ = QFileDialog.getOpenFileName(self, "Load Macro", "", OPEN_FILTERS)
+        if path:
+            self.open_macro(path)
+
+    def open_macro(self, path):
+        if self.action_tree.is_loading:
+            self.action_tree.cancel_load()
+        self._start_load(MacroStream(path))
+
+    # =====================================================
+    # LIBRARY
+    # =====================================================
+    def toggle_library(self, visible):
+        self.library_panel.setVisible(visible)
+        if visible:
+            self.library_panel.update_results()
+            self.library_panel.refresh()
+            self.library_panel.search_box.setFocus()
+
+    def add_to_library(self):
+        name, ok = QInputDialog.getText(self, "Add to Library", "Macro name:")
+        if not ok or not name.strip():
             return
+        name = name.strip()
+        overwrite = False
+        if self.library.existing(name) is not None:
+            answer = QMessageBox.question(
+                self, "Add to Library",
+                f"A macro named \"{name}\" is already in the library.\n\n"
+                "Replace it? (No keeps both and adds a numbered copy.)",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No,
+            )
+            if answer == QMessageBox.Cancel:
+                return
+            overwrite = answer == QMessageBox.Yes
         try:
-            data = Storage.load(path)
-            if isinstance(data, list) and data:
-                self.action_tree.load_json(data)
+            if self.library.add(name, self.action_tree.to_json(), overwrite=overwrite):
+                self.library_panel.update_results()
         except Exception as e:
-            print(f"[LOAD ERROR] {e}")
+            print(f"[LIBRARY ERROR] {e}")
@@ -1,4 +1,6 @@
-from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QDoubleSpinBox, QSpinBox
+from PyQt5.QtWidgets import (
+    QWidget, QHBoxLayout, QLabel, QPushButton, QDoubleSpinBox, QSpinBox, QCheckBox
+)
 
 
 class ControlPanel(QWidget):
@@ -12,7 +14,9 @@ class ControlPanel(QWidget):
         # === Buttons ===
         self.btn_record = QPushButton("⏺ Record (F9)")
         self.btn_play = QPushButton("▶ Play (F10)")
-        for b in (self.btn_record, self.btn_play):
+        self.btn_pause = QPushButton("⏸ Pause (F11)")
+        self.btn_pause.setEnabled(False)
+        for b in (self.btn_record, self.btn_play, self.btn_pause):
             b.setFixedHeight(36)
             b.setMinimumWidth(140)
             layout.addWidget(b)
@@ -20,6 +24,16 @@ class ControlPanel(QWidget):
         # === Spacer ===
         layout.addStretch(1)
 
+        # === Sampling Rate Cap ===
+        layout.addWidget(QLabel("Max Hz (0 = raw):"))
+        self.rate_box = QSpinBox()
+        self.rate_box.setRange(0, 8000)
+        self.rate_box.setValue(240)
+        self.rate_box.setSingleStep(60)
+        self.rate_box.setFixedWidth(80)
+        self.rate_box.setToolTip("Cap for recorded mouse move/drag samples per second")
+        layout.addWidget(self.rate_box)
+
         # === Speed Control ===
         layout.addWidget(QLabel("Speed:"))
         self.speed_box = QDoubleSpinBox()
@@ -37,4 +51,28 @@ class ControlPanel(QWidget):
         self.repeat_box.setFixedWidth(80)
         layout.addWidget(self.repeat_box)
 
+        # === Timeline Mode ===
+        self.timeline_box = QCheckBox("Exact timing")
+        self.timeline_box.setToolTip(
+            "Schedule every step on an absolute timeline from the recorded durations "
+            "(no fixed pauses between steps, late steps catch up)"
+        )
+        layout.addWidget(self.timeline_box)
+
+        # === Telemetry ===
+        self.telemetry_box = QCheckBox("Telemetry")
+        self.telemetry_box.setToolTip(
+            "Record scheduled vs. actual time of every injected event and export "
+            "a CSV/JSON timing report when playback ends"
+        )
+        layout.addWidget(self.telemetry_box)
+
+        # === Realtime Mode ===
+        self.realtime_box = QCheckBox("Realtime")
+        self.realtime_box.setToolTip(
+            "Low-jitter playback: freeze the garbage collector while playing and "
+            "raise the playback thread's priority where permitted"
+        )
+        layout.addWidget(self.realtime_box)
+
         self.setLayout(layout)
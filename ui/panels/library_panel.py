@@ -0,0 +1,139 @@
+import time
+from threading import Thread
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
+)
+
+
+class LibraryPanel(QWidget):
+    """Searchable list of the macros in a :class:`core.library.MacroLibrary`.
+
+    Typing filters the list straight from the SQLite index. Rescanning the
+    library folder runs on a worker thread.
+    """
+
+    open_requested = pyqtSignal(str)
+    add_requested = pyqtSignal()
+    refreshed = pyqtSignal(int, int)
+
+    COLUMNS = ("Name", "Actions", "Duration", "Groups", "Keys")
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self._refreshing = False
+
+        layout = QVBoxLayout()
+        layout.setSpacing(6)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # === Search / Buttons ===
+        top = QHBoxLayout()
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search names, groups, comments, keys…")
+        self.search_box.setClearButtonEnabled(True)
+        top.addWidget(self.search_box, 1)
+        self.btn_open = QPushButton("Open")
+        self.btn_add = QPushButton("Add Current")
+        self.btn_refresh = QPushButton("Rescan")
+        self.btn_refresh.setToolTip(f"Re-index changed files in {library.root}")
+        for b in (self.btn_open, self.btn_add, self.btn_refresh):
+            b.setFixedHeight(30)
+            top.addWidget(b)
+        layout.addLayout(top)
+
+        # === Results ===
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(len(self.COLUMNS) - 1, QHeaderView.Stretch)
+        self.table.setMinimumHeight(180)
+        layout.addWidget(self.table)
+
+        self.status = QLabel("")
+        self.status.setStyleSheet("color: #888;")
+        layout.addWidget(self.status)
+        self.setLayout(layout)
+
+        # === Signals ===
+        self.search_box.textChanged.connect(self.update_results)
+        self.table.itemDoubleClicked.connect(self._open_selected)
+        self.btn_open.clicked.connect(self._open_selected)
+        self.btn_add.clicked.connect(lambda: self.add_requested.emit())
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.refreshed.connect(self._on_refreshed)
+
+    # =====================================================
+    # Index
+    # =====================================================
+    def refresh(self):
+        """Re-index the library folder on a worker thread."""
+        if self._refreshing:
+            return
+        self._refreshing = True
+        self.btn_refresh.setEnabled(False)
+        self.status.setText("Scanning library…")
+        Thread(target=self._refresh_worker, daemon=True).start()
+
+    def _refresh_worker(self):
+        try:
+            updated, removed = self.library.refresh()
+        except Exception as e:
+            print(f"[LIBRARY ERROR] {e}")
+            updated = removed = -1
+        self.refreshed.emit(updated, removed)
+
+    def _on_refreshed(self, updated, removed):
+        self._refreshing = False
+        self.btn_refresh.setEnabled(True)
+        self.update_results()
+        if updated > 0 or removed > 0:
+            print(f"[INFO] Library: {updated} updated, {removed} removed")
+
+    # =====================================================
+    # Results
+    # =====================================================
+    def update_results(self, *_):
+        t0 = time.perf_counter()
+        try:
+            rows = self.library.search(self.search_box.text())
+        except Exception as e:
+            print(f"[LIBRARY ERROR] {e}")
+            rows = []
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        table = self.table
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            name = QTableWidgetItem(row["name"])
+            name.setData(Qt.UserRole, str(self.library.path_of(row)))
+            name.setToolTip(row["comments"] or row["path"])
+            actions = QTableWidgetItem(str(row["actions"]))
+            actions.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            duration = QTableWidgetItem(f"{row['duration']:.1f} s")
+            duration.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            groups = QTableWidgetItem(", ".join(row["groups"].splitlines()))
+            keys = QTableWidgetItem(row["keys"][:200])
+            keys.setToolTip(row["keys"][:1000])
+            for c, item in enumerate((name, actions, duration, groups, keys)):
+                table.setItem(r, c, item)
+        table.setUpdatesEnabled(True)
+        if not self._refreshing:
+            self.status.setText(f"{len(rows)} macros ({elapsed:.1f} ms)")
+
+    def _open_selected(self, *_):
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        item = self.table.item(row, 0)
+        if item is not None:
+            self.open_requested.emit(item.data(Qt.UserRole))